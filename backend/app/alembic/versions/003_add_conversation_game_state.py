@@ -0,0 +1,35 @@
+"""Bind conversations to a saved game state
+
+Revision ID: 003_add_conversation_game_state
+Revises: 002_add_user_model_preference
+Create Date: 2026-10-17 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "003_add_conversation_game_state"
+down_revision = "002_add_user_model_preference"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("conversations", sa.Column("game_state_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_conversations_game_state_id",
+        "conversations",
+        "game_states",
+        ["game_state_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index("ix_conversations_game_state_id", "conversations", ["game_state_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversations_game_state_id", table_name="conversations")
+    op.drop_constraint("fk_conversations_game_state_id", "conversations", type_="foreignkey")
+    op.drop_column("conversations", "game_state_id")
@@ -1,10 +1,15 @@
+import json
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 from ..dependencies import get_current_user, get_db
 from ..models.conversation import Conversation
+from ..models.game_state import GameState
 from ..models.user import User
 from ..schemas.conversation import (
     ConversationCreate,
@@ -15,11 +20,17 @@ from ..schemas.conversation import (
 )
 from ..services.melvin import get_melvin_service
 from ..services.messages import append_message, fetch_messages
+from ..services.state_manager import state_manager_cls
+from ..services.worker_pool import AdmissionTicket, PipelineBusyError, get_answer_pool
 
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
 
 
+def _format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
 @router.get("/", response_model=list[ConversationOut])
 def list_conversations(
     user: User = Depends(get_current_user),
@@ -40,7 +51,9 @@ def create_conversation(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> ConversationOut:
-    record = Conversation(user_id=user.id, title=payload.title)
+    if payload.game_state_id is not None:
+        _require_own_game_state(db, payload.game_state_id, user)
+    record = Conversation(user_id=user.id, title=payload.title, game_state_id=payload.game_state_id)
     db.add(record)
     db.commit()
     db.refresh(record)
@@ -53,7 +66,7 @@ async def get_conversation(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> ConversationDetail:
-    record = db.get(Conversation, conversation_id)
+    record = await run_in_threadpool(db.get, Conversation, conversation_id)
     if not record or record.user_id != user.id:
         raise HTTPException(status_code=404, detail="Conversation not found")
     messages = await fetch_messages(conversation_id)
@@ -63,6 +76,67 @@ async def get_conversation(
     return ConversationDetail(conversation=conversation_schema, messages=[Message(**msg) for msg in messages])
 
 
+def _admit_answer() -> AdmissionTicket:
+    """Reserve a slot on the answer worker pool or reject with 429."""
+    try:
+        return get_answer_pool().admit()
+    except PipelineBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"message": str(exc), "queued": exc.queued},
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
+
+def _require_own_game_state(db: Session, game_state_id: int, user: User) -> None:
+    """404 unless the board exists and was saved under this user's username (reads only `owner`)."""
+    owner = db.query(GameState.owner).filter(GameState.id == game_state_id).scalar()
+    if owner is None or owner != user.username:
+        # Same answer for missing and foreign boards, so ids of other users' boards are not revealed.
+        raise HTTPException(status_code=404, detail="Game state not found")
+
+
+def _bind_game_state(db: Session, record: Conversation, game_state_id: int | None, user: User) -> int | None:
+    """
+    Persist a per-request board state choice on the conversation and return the id to answer with.
+
+    An explicit id must name one of the user's own boards (saved with `owner` =
+    username). A conversation with no bound state falls back to the user's most
+    recently updated board without binding it.
+    """
+    if game_state_id is None or game_state_id == record.game_state_id:
+        if record.game_state_id is not None:
+            return record.game_state_id
+        return state_manager_cls(db).latest_state_id(user.username)
+    _require_own_game_state(db, game_state_id, user)
+    record.game_state_id = game_state_id
+    db.add(record)
+    db.commit()
+    return game_state_id
+
+
+def _answer_question(payload: MessageCreate, user: User, game_state_id: int | None):
+    return get_melvin_service().answer_question_with_details(
+        payload.question,
+        user=user,
+        tone=payload.tone,
+        detail_level=payload.detail_level,
+        selected_cards=payload.card_names or [],
+        game_state_id=game_state_id,
+    )
+
+
+def _stream_answer(payload: MessageCreate, user: User, game_state_id: int | None):
+    return get_melvin_service().stream_answer(
+        payload.question,
+        user=user,
+        tone=payload.tone,
+        detail_level=payload.detail_level,
+        selected_cards=payload.card_names or [],
+        game_state_id=game_state_id,
+    )
+
+
 @router.post("/{conversation_id}/chat", response_model=Message)
 async def chat_with_melvin(
     conversation_id: int,
@@ -70,17 +144,16 @@ async def chat_with_melvin(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Message:
-    record = db.get(Conversation, conversation_id)
+    record = await run_in_threadpool(db.get, Conversation, conversation_id)
     if not record or record.user_id != user.id:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    await append_message(conversation_id, "user", payload.question)
-    response_text, thinking_steps, context_snapshot = get_melvin_service().answer_question_with_details(
-        payload.question,
-        user=user,
-        tone=payload.tone,
-        detail_level=payload.detail_level,
-        selected_cards=payload.card_names or [],
-    )
+    game_state_id = await run_in_threadpool(_bind_game_state, db, record, payload.game_state_id, user)
+    ticket = _admit_answer()
+    try:
+        await append_message(conversation_id, "user", payload.question)
+        response_text, thinking_steps, context_snapshot = await ticket.run(_answer_question, payload, user, game_state_id)
+    finally:
+        ticket.release()
     await append_message(conversation_id, "melvin", response_text, thinking=thinking_steps, context=context_snapshot)
     return Message(
         sender="melvin",
@@ -89,3 +162,65 @@ async def chat_with_melvin(
         thinking=thinking_steps,
         context=context_snapshot,
     )
+
+
+@router.post("/{conversation_id}/chat/stream")
+async def stream_chat_with_melvin(
+    conversation_id: int,
+    payload: MessageCreate,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Server-sent events variant of `chat_with_melvin`.
+
+    Emits a `queued` event when waiting for a worker, `thinking` events as pipeline
+    stages finish, `token` events as Ollama generates, then a `done` event with the
+    persisted Melvin message.
+    """
+    record = await run_in_threadpool(db.get, Conversation, conversation_id)
+    if not record or record.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    game_state_id = await run_in_threadpool(_bind_game_state, db, record, payload.game_state_id, user)
+    ticket = _admit_answer()
+    try:
+        await append_message(conversation_id, "user", payload.question)
+    except Exception:
+        ticket.release()
+        raise
+
+    async def event_source():
+        try:
+            if ticket.queue_position:
+                yield _format_sse("queued", {"position": ticket.queue_position})
+            async for event in ticket.iterate(_stream_answer, payload, user, game_state_id):
+                if event["event"] != "done":
+                    yield _format_sse(event["event"], event["data"])
+                    continue
+                final = event["data"]
+                await append_message(
+                    conversation_id,
+                    "melvin",
+                    final["answer"],
+                    thinking=final["thinking"],
+                    context=final["context"],
+                )
+                message = Message(
+                    sender="melvin",
+                    content=final["answer"],
+                    created_at=datetime.utcnow(),
+                    thinking=final["thinking"],
+                    context=final["context"],
+                )
+                yield _format_sse("done", message.model_dump(mode="json"))
+        except Exception as exc:
+            yield _format_sse("error", {"detail": str(exc)})
+        finally:
+            ticket.release()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also release after the response in case the client disconnected before streaming began.
+        background=BackgroundTask(ticket.release),
+    )
@@ -0,0 +1,51 @@
+import os
+import resource
+
+from fastapi import APIRouter, Depends
+
+from ..dependencies import get_current_admin
+from ..models.user import User
+from ..services.embeddings import embedding_provider
+from ..services.melvin import melvin_service_loaded
+from ..services.metrics import stage_latency
+from ..services.worker_pool import get_answer_pool
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/latency")
+def get_pipeline_latency(_: User = Depends(get_current_admin)) -> dict:
+    """p50/p95 per answer-pipeline stage over the rolling window, plus worker pool load."""
+    return {
+        "window": stage_latency.window,
+        "stages": stage_latency.summary(),
+        "answer_pool": get_answer_pool().stats(),
+    }
+
+
+@router.delete("/latency")
+def reset_pipeline_latency(_: User = Depends(get_current_admin)) -> dict:
+    stage_latency.reset()
+    return {"status": "reset"}
+
+
+def _rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            pages = int(handle.read().split()[1])
+    except (OSError, ValueError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+@router.get("/memory")
+def get_memory_diagnostics(_: User = Depends(get_current_admin)) -> dict:
+    """Resident memory of this worker and which heavyweight components it has loaded."""
+    return {
+        "pid": os.getpid(),
+        "rss_mb": _rss_mb(),
+        # ru_maxrss is in KiB on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "embedding": embedding_provider.describe(),
+        "melvin_service_loaded": melvin_service_loaded(),
+    }
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from . import auth, banned_cards, conversations, profiles, scryfall, game_state, rules, cards, models
+from . import auth, banned_cards, conversations, profiles, scryfall, game_state, rules, cards, models, metrics
+from ..services.warmup import warmup_tracker
 
 
 router = APIRouter()
@@ -11,6 +12,12 @@ def healthcheck() -> dict:
     return {"status": "ok"}
 
 
+@router.get("/health/warmup", tags=["system"])
+def warmup_status() -> dict:
+    """Per-component readiness of the optional startup warm-up."""
+    return warmup_tracker.snapshot()
+
+
 router.include_router(auth.router)
 router.include_router(banned_cards.router)
 router.include_router(conversations.router)
@@ -20,4 +27,5 @@ router.include_router(game_state.router)
 router.include_router(rules.router)
 router.include_router(cards.router)
 router.include_router(models.router)
+router.include_router(metrics.router)
 
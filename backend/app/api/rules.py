@@ -3,6 +3,7 @@ from fastapi.params import Body
 from typing import Dict, Any
 
 from ..services import rule_engine
+from ..services.rule_index import rule_index
 
 router = APIRouter(prefix="/rules", tags=["rules"])
 
@@ -34,3 +35,12 @@ def api_resolve_stack(payload: Dict[str, Any] = Body(...)):
 def api_compute_combat(payload: Dict[str, Any] = Body(...)):
     state = payload.get("state", {})
     return rule_engine.compute_combat_damage(state)
+
+
+@router.get("/text/{rule_id}")
+def api_rule_text(rule_id: str, include_children: bool = True):
+    """Exact Comprehensive Rules text for a rule number, with its direct subrules."""
+    entry = rule_index.lookup(rule_id, include_children=include_children)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
+    return entry
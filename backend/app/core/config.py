@@ -1,7 +1,7 @@
 import json
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -31,6 +31,8 @@ class Settings(BaseSettings):
     ollama_host: str = "ollama"
     ollama_port: int = 11434
     ollama_model: str = "llama2"
+    # How long Ollama keeps the model resident after the warm-up preload request
+    ollama_keep_alive: str = "30m"
 
     allowed_origins: List[str] = Field(
         default_factory=lambda: ["http://localhost:8001", "http://127.0.0.1:8001"]
@@ -42,6 +44,67 @@ class Settings(BaseSettings):
     # Optional Redis URL for shared caching (example: redis://redis:6379/0)
     redis_url: str | None = None
 
+    # Vector store written by ingest: "chroma" or "faiss" (memory-mapped; queries follow the current generation)
+    vector_store_backend: str = "chroma"
+    # Vector retrieval fan-out: the four corpora are searched concurrently on a bounded pool
+    # (never smaller than answer_workers * 4, so concurrent answers do not queue behind each other)
+    retrieval_max_workers: int = 4
+    retrieval_timeout_seconds: float = 5.0
+    # Passages kept per corpus after fusing vector and BM25 results, and the depth each ranker contributes
+    retrieval_k: int = 4
+    retrieval_candidates: int = 12
+    hybrid_retrieval_enabled: bool = True
+    # Optional cross-encoder rescoring: candidates per corpus, passages kept overall, and a hard time budget
+    reranker_enabled: bool = False
+    reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    reranker_candidates: int = 12
+    reranker_top_n: int = 8
+    reranker_budget_ms: int = 400
+    reranker_batch_size: int = 16
+    # Rulings per resolved card pulled straight from the oracle_id index (newest first)
+    card_rulings_limit: int = 6
+    # Semantic rulings search fills retrieval_k minus the indexed rulings, but never fewer than
+    # this, so one well-ruled card (4+ rulings at the default k) cannot crowd out rulings about
+    # other cards that interact with it; 0 lets indexed rulings replace the search entirely
+    semantic_rulings_min: int = 1
+    # MiniLM runtime: "torch" (sentence-transformers), "onnx" (fp32 export) or "onnx-int8"
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: Path = Path(__file__).resolve().parents[3] / "data" / "processed" / "models" / "all-MiniLM-L6-v2-onnx"
+    # Number of normalized questions whose MiniLM query vectors are kept in memory
+    query_embedding_cache_size: int = 512
+
+    # Semantic answer cache in front of Ollama (shared through redis_url when set)
+    answer_cache_enabled: bool = True
+    answer_cache_ttl_seconds: int = 60 * 60 * 24
+    answer_cache_max_entries: int = 256
+    answer_cache_similarity: float = 0.95
+
+    # Answer pipeline admission: concurrent generations plus how many may wait for a worker
+    answer_workers: int = 2
+    answer_queue_limit: int = 4
+    answer_retry_after_seconds: int = 15
+
+    # How long the chat path may reuse a conversation's board-state JSON without reloading it
+    game_state_cache_ttl_seconds: int = 30
+
+    # Number of recent answers per pipeline stage kept for the p50/p95 latency view
+    latency_window_size: int = 500
+
+    # Approximate prompt token budget for retrieved context; per-model overrides as JSON
+    # (example: PROMPT_TOKEN_BUDGETS={"llama2": 3000, "phi3:mini": 1500})
+    prompt_token_budget: int = 2500
+    prompt_token_budgets: Dict[str, int] = Field(default_factory=dict)
+
+    # Build MiniLM, Chroma, the Oracle data and preload the Ollama model in the background after startup
+    warmup_on_startup: bool = False
+    warmup_ollama_timeout_seconds: float = 300.0
+
+    # Ingest embedding: chunks per batch and embedding worker processes (0 = one per CPU core)
+    ingest_batch_size: int = 256
+    ingest_workers: int = 0
+    # How long a replaced vector store generation stays on disk for in-flight queries
+    vectorstore_gc_grace_seconds: int = 600
+
     @field_validator("allowed_origins", mode="before")
     @classmethod
     def parse_origins(cls, value):
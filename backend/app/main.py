@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -10,7 +10,8 @@ from .core.config import get_settings
 from .core.database import SessionLocal
 from .services.bootstrap import init_db
 from .services.assessment_bootstrap import bootstrap_assessment_questions
-from .services.ingest import ingest_service
+from .services.ingest_jobs import ingest_jobs
+from .services.warmup import start_warmup_thread
 
 
 settings = get_settings()
@@ -34,13 +35,34 @@ async def startup_event() -> None:
         bootstrap_assessment_questions(db)
     finally:
         db.close()
-    # Melvin service now lazy-loads on first use to keep startup fast
+    # Melvin service lazy-loads on first use to keep startup fast; optionally warm it
+    # up in the background so the health check is not delayed.
+    if settings.warmup_on_startup:
+        start_warmup_thread()
 
 
-@app.post("/ingest", tags=["system"])
+@app.post("/ingest", tags=["system"], status_code=status.HTTP_202_ACCEPTED)
 def ingest_data() -> dict:
-    ingest_service.ingest()
-    return {"status": "ok"}
+    """Start an ingest job, or return the one already running."""
+    snapshot, started = ingest_jobs.submit()
+    return {**snapshot, "started": started}
+
+
+@app.get("/ingest/{job_id}", tags=["system"])
+def ingest_status(job_id: str) -> dict:
+    snapshot = ingest_jobs.status(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingest job not found")
+    return snapshot
+
+
+@app.post("/ingest/{job_id}/cancel", tags=["system"])
+def cancel_ingest(job_id: str) -> dict:
+    """Ask a running job to stop after its current batch; finished work stays checkpointed."""
+    snapshot = ingest_jobs.cancel(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingest job not found")
+    return snapshot
 
 
 app.include_router(api_router, prefix=settings.api_prefix)
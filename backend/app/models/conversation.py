@@ -15,5 +15,7 @@ class Conversation(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     title = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Board state Melvin should consult for this conversation (optional)
+    game_state_id = Column(Integer, ForeignKey("game_states.id", ondelete="SET NULL"), nullable=True, index=True)
 
     user = relationship("User", backref="conversations")
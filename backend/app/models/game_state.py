@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, JSON, DateTime
+from sqlalchemy import Column, Index, Integer, String, JSON, DateTime
 from ..core.database import Base
 
 
 class GameState(Base):
     __tablename__ = "game_states"
+    # Serves the "newest board for this owner" fallback for conversations without a bound state.
+    __table_args__ = (Index("ix_game_states_owner_updated_at", "owner", "updated_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
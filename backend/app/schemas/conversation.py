@@ -6,12 +6,14 @@ from pydantic import BaseModel, Field, ConfigDict
 
 class ConversationCreate(BaseModel):
     title: str = Field(..., min_length=3, max_length=100)
+    game_state_id: int | None = None
 
 
 class ConversationOut(BaseModel):
     id: int
     title: str
     created_at: datetime
+    game_state_id: int | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -29,6 +31,8 @@ class MessageCreate(BaseModel):
     tone: str | None = None
     detail_level: str | None = None
     card_names: List[str] | None = None
+    # Binds the conversation to this saved board state from this turn onward
+    game_state_id: int | None = None
 
 
 class ConversationDetail(BaseModel):
@@ -0,0 +1,211 @@
+"""Semantic cache for final Melvin answers, placed in front of the Ollama call."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import redis
+
+from ..core.config import get_settings
+from .corpus import read_corpus_version
+
+
+class AnswerCache:
+    """
+    Stores generated answers keyed by (corpus version, model, prompt context hash).
+
+    Within one key, an entry is reused when the new question's embedding has cosine
+    similarity of at least `similarity_threshold` with the cached question. The
+    question text itself is excluded from the context hash so that rephrasings that
+    retrieve the same context can share an answer. Entries expire after `ttl_seconds`
+    and the in-process store evicts least recently used entries beyond `max_entries`.
+    When `redis_url` is configured the cache is shared through Redis instead; if Redis
+    stops answering, the in-process store is used for `REDIS_RETRY_SECONDS` before
+    Redis is tried again, so an outage costs one short timeout rather than one per request.
+    """
+
+    # Connect and read/write timeouts: a cache call must never cost more than a miss.
+    REDIS_TIMEOUT_SECONDS = 0.25
+    REDIS_RETRY_SECONDS = 30.0
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_entries: int,
+        similarity_threshold: float,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = read_corpus_version()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._redis_down = False
+        if redis_url:
+            try:
+                self._redis = redis.from_url(
+                    redis_url,
+                    socket_connect_timeout=self.REDIS_TIMEOUT_SECONDS,
+                    socket_timeout=self.REDIS_TIMEOUT_SECONDS,
+                )
+            except Exception as exc:
+                print(f"[melvin] Invalid REDIS_URL for the answer cache ({exc}); caching in process")
+                self._redis = None
+
+    def _shared(self):
+        """The Redis client, or None while it is unset or backing off after a failure."""
+        if self._redis is None or time.monotonic() < self._redis_retry_at:
+            return None
+        return self._redis
+
+    def _redis_failed(self, exc: Exception) -> None:
+        self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
+        if not self._redis_down:
+            self._redis_down = True
+            print(
+                f"[melvin] Answer cache Redis unavailable ({exc}); "
+                f"caching in process, retrying every {self.REDIS_RETRY_SECONDS:.0f}s"
+            )
+
+    def _redis_ok(self) -> None:
+        if self._redis_down:
+            self._redis_down = False
+            print("[melvin] Answer cache Redis reachable again")
+
+    @staticmethod
+    def context_hash(prompt_input: Dict[str, Any]) -> str:
+        scoped = {key: value for key, value in prompt_input.items() if key != "question"}
+        encoded = json.dumps(scoped, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def _similarity(left: List[float], right: List[float]) -> float:
+        a = np.asarray(left, dtype=np.float32)
+        b = np.asarray(right, dtype=np.float32)
+        denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+        if denom == 0.0:
+            return 0.0
+        return float(np.dot(a, b) / denom)
+
+    def _bucket(self, model: str, prompt_input: Dict[str, Any]) -> str:
+        version = read_corpus_version()
+        if version != self._version:
+            # A new ingest produced a new corpus; nothing cached so far can be trusted.
+            with self._lock:
+                self._entries.clear()
+                self._version = version
+        return f"{version}:{model}:{self.context_hash(prompt_input)}"
+
+    def lookup(
+        self,
+        embedding: List[float],
+        model: str,
+        prompt_input: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """Return the best cached entry above the similarity threshold, if any."""
+        bucket = self._bucket(model, prompt_input)
+        now = time.time()
+        best: Optional[Dict[str, Any]] = None
+        best_score = self.similarity_threshold
+        for entry in self._bucket_entries(bucket):
+            if now - entry["created_at"] > self.ttl_seconds:
+                continue
+            score = self._similarity(embedding, entry["embedding"])
+            if score >= best_score:
+                best, best_score = entry, score
+        if best is None:
+            return None
+        with self._lock:
+            key = (bucket, best["question"])
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return {**best, "similarity": best_score}
+
+    def store(
+        self,
+        question: str,
+        embedding: List[float],
+        model: str,
+        prompt_input: Dict[str, Any],
+        answer: str,
+        thinking: List[Dict[str, str]],
+        context: Dict[str, Any],
+    ) -> None:
+        bucket = self._bucket(model, prompt_input)
+        entry = {
+            "question": " ".join(question.lower().split()),
+            "embedding": [float(value) for value in embedding],
+            "answer": answer,
+            "thinking": list(thinking),
+            "context": dict(context),
+            "created_at": time.time(),
+        }
+        shared = self._shared()
+        if shared is not None:
+            try:
+                key = f"melvin:answer:{bucket}"
+                shared.hset(key, entry["question"], json.dumps(entry, default=str))
+                shared.expire(key, self.ttl_seconds)
+                self._trim_redis_bucket(shared, key)
+                self._redis_ok()
+                return
+            except Exception as exc:
+                self._redis_failed(exc)
+        with self._lock:
+            self._entries[(bucket, entry["question"])] = entry
+            self._entries.move_to_end((bucket, entry["question"]))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _bucket_entries(self, bucket: str) -> List[Dict[str, Any]]:
+        shared = self._shared()
+        if shared is not None:
+            try:
+                raw = shared.hvals(f"melvin:answer:{bucket}")
+                self._redis_ok()
+                return [json.loads(item) for item in raw]
+            except Exception as exc:
+                self._redis_failed(exc)
+        with self._lock:
+            return [entry for (entry_bucket, _), entry in self._entries.items() if entry_bucket == bucket]
+
+    def _trim_redis_bucket(self, shared, key: str) -> None:
+        if shared.hlen(key) <= self.max_entries:
+            return
+        entries = [json.loads(item) for item in shared.hvals(key)]
+        entries.sort(key=lambda item: item.get("created_at", 0))
+        stale = [item["question"] for item in entries[: len(entries) - self.max_entries]]
+        if stale:
+            shared.hdel(key, *stale)
+
+
+_answer_cache: AnswerCache | None = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                settings = get_settings()
+                _answer_cache = AnswerCache(
+                    ttl_seconds=settings.answer_cache_ttl_seconds,
+                    max_entries=settings.answer_cache_max_entries,
+                    similarity_threshold=settings.answer_cache_similarity,
+                    redis_url=settings.redis_url,
+                )
+    return _answer_cache
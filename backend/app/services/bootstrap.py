@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from ..core.config import get_settings
 from ..core.database import Base, SessionLocal, engine
 from ..core.security import hash_password
+from ..models.game_state import GameState
 from ..models.user import User
 from .banned_cards import banned_cards_service
 
@@ -18,6 +19,7 @@ def init_db(max_retries: int = 10, base_delay: float = 1.0) -> None:
     while attempt < max_retries:
         try:
             Base.metadata.create_all(bind=engine)
+            ensure_indexes()
             ensure_admin_exists()
             load_banned_cards()
             return
@@ -30,6 +32,12 @@ def init_db(max_retries: int = 10, base_delay: float = 1.0) -> None:
             time.sleep(sleep_for)
 
 
+def ensure_indexes() -> None:
+    """create_all skips tables that already exist, so add indexes introduced since then."""
+    for index in GameState.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
 def ensure_admin_exists() -> None:
     settings = get_settings()
     db: Session = SessionLocal()
@@ -0,0 +1,201 @@
+"""Find Oracle card names mentioned anywhere in free text without brackets."""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from .data_loader import CardEntry, datastore
+
+
+# Layouts that share names with real cards but are never what a question refers to.
+IGNORED_LAYOUTS = {"token", "double_faced_token", "emblem", "art_series"}
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+# Punctuation after which the next word is capitalized by grammar, not because it is a name.
+SENTENCE_BREAK = re.compile(r"[.!?:;\n]")
+# Opening quote or bracket right before a word; the user is marking it as a name.
+NAME_MARKERS = "\"'\u201c\u2018[("
+
+
+def _tokens(text: str) -> List[str]:
+    return [token.casefold() for token in TOKEN_PATTERN.findall(text or "")]
+
+
+class CardNameDetector:
+    """
+    Word-level Aho-Corasick automaton over every Oracle card name.
+
+    Built once from `datastore.cards`; `detect` then scans a question in a single
+    linear pass over its words and returns each card mentioned, preferring the
+    longest non-overlapping match (so "Sol Ring" wins over "Ring"). A name only
+    matches when its first word is capitalized in the text, and a name at the start of
+    a sentence, where grammar capitalizes it anyway, also needs a later word
+    capitalized, so single words there never match unless quoted or bracketed. That
+    keeps everyday words and phrases ("opt", "Flash gives...", "cast out", "time walk")
+    from being read as card references; a quoted or bracketed name always matches. Split and double-faced cards are also reachable through each face name.
+    """
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[int] = [-1]
+        self._out_link: List[int] = [0]
+        self._entries: List[CardEntry] = []
+        self._lengths: List[int] = []
+        self._built = False
+        self._lock = threading.Lock()
+
+    def _ensure_built(self) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            if not datastore.cards:
+                datastore.load()
+            self._build(datastore.cards)
+            self._built = True
+
+    def _build(self, cards: List[CardEntry]) -> None:
+        seen: Dict[Tuple[str, ...], int] = {}
+        for entry in cards:
+            if not entry.name or (entry.layout or "") in IGNORED_LAYOUTS:
+                continue
+            names = [entry.name]
+            if "//" in entry.name:
+                names.extend(part.strip() for part in entry.name.split("//") if part.strip())
+            for name in names:
+                words = tuple(_tokens(name))
+                if not words or words in seen:
+                    continue
+                self._entries.append(entry)
+                self._lengths.append(len(words))
+                seen[words] = len(self._entries) - 1
+                self._insert(words, seen[words])
+        self._link()
+
+    def _insert(self, words: Tuple[str, ...], index: int) -> None:
+        node = 0
+        for word in words:
+            nxt = self._goto[node].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(-1)
+                self._out_link.append(0)
+                self._goto[node][word] = nxt
+            node = nxt
+        self._terminal[node] = index
+
+    def _link(self) -> None:
+        queue: deque[int] = deque()
+        for child in self._goto[0].values():
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                fail = self._fail[child]
+                self._out_link[child] = fail if self._terminal[fail] >= 0 else self._out_link[fail]
+                queue.append(child)
+
+    def _scan(self, text: str) -> Tuple[List[Tuple[str, bool, bool, bool]], List[Tuple[int, int, int]]]:
+        """
+        Words of `text` as (casefolded word, capitalized, starts a sentence, quoted) plus
+        the accepted matches as (start word, length, entry index), longest first per start.
+        """
+        self._ensure_built()
+        words: List[Tuple[str, bool, bool, bool]] = []
+        previous_end = 0
+        for match in TOKEN_PATTERN.finditer(text or ""):
+            sentence_start = not words or bool(SENTENCE_BREAK.search(text, previous_end, match.start()))
+            quoted = match.start() > 0 and text[match.start() - 1] in NAME_MARKERS
+            words.append((match.group(0).casefold(), match.group(0)[:1].isupper(), sentence_start, quoted))
+            previous_end = match.end()
+        matches: List[Tuple[int, int, int]] = []
+        node = 0
+        for position, (word, _, _, _) in enumerate(words):
+            while node and word not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(word, 0)
+            hit = node if self._terminal[node] >= 0 else self._out_link[node]
+            while hit:
+                index = self._terminal[hit]
+                length = self._lengths[index]
+                start = position - length + 1
+                if self._cased_like_a_name(words[start : start + length]):
+                    matches.append((start, length, index))
+                hit = self._out_link[hit]
+        matches.sort(key=lambda item: (item[0], -item[1]))
+        return words, matches
+
+    @staticmethod
+    def _cased_like_a_name(span: List[Tuple[str, bool, bool, bool]]) -> bool:
+        _, capitalized, sentence_start, quoted = span[0]
+        if quoted:
+            return True
+        if not capitalized:
+            return False
+        if sentence_start:
+            # "Flash gives..." and "Cast out the..." are capitalized by grammar; "Cast Out" names the card.
+            return any(later_capitalized for _, later_capitalized, _, _ in span[1:])
+        return True
+
+    def _select(self, matches: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+        """Longest non-overlapping matches, left to right."""
+        selected: List[Tuple[int, int, int]] = []
+        covered_until = -1
+        for start, length, index in matches:
+            if start <= covered_until:
+                continue
+            covered_until = start + length - 1
+            selected.append((start, length, index))
+        return selected
+
+    def detect(self, text: str, limit: Optional[int] = None) -> List[CardEntry]:
+        """Return cards mentioned in `text`, in order of first appearance."""
+        _, matches = self._scan(text)
+        results: List[CardEntry] = []
+        seen_names: set[str] = set()
+        for _, _, index in self._select(matches):
+            entry = self._entries[index]
+            if entry.name in seen_names:
+                continue
+            seen_names.add(entry.name)
+            results.append(entry)
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def uncovered_capitalized_spans(self, text: str) -> List[str]:
+        """
+        Runs of capitalized words that no detected card covers, e.g. a misspelled or
+        newer card name. Sentence-initial single words and "I" are not counted.
+        """
+        words, matches = self._scan(text)
+        covered: set[int] = set()
+        for start, length, _ in self._select(matches):
+            covered.update(range(start, start + length))
+        runs: List[List[int]] = []
+        for position, (word, capitalized, sentence_start, _) in enumerate(words):
+            if not capitalized or position in covered or word == "i":
+                continue
+            if runs and runs[-1][-1] == position - 1 and not sentence_start:
+                runs[-1].append(position)
+            else:
+                runs.append([position])
+        return [
+            " ".join(words[position][0] for position in run)
+            for run in runs
+            if len(run) > 1 or not words[run[0]][2]
+        ]
+
+
+card_name_detector = CardNameDetector()
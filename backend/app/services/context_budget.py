@@ -0,0 +1,126 @@
+"""Token-budgeted selection of retrieved passages for the Melvin prompt."""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+
+# Multiplier applied to a passage's relevance score when ranking across corpora.
+SOURCE_PRIORITY = {
+    "rules": 1.0,
+    "cards": 0.9,
+    "rulings": 0.8,
+    "reference": 0.7,
+}
+NEAR_DUPLICATE_JACCARD = 0.8
+_WORD_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap model-agnostic estimate (~4 characters per token for English prose)."""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+def _word_set(text: str) -> Set[str]:
+    return {word.casefold() for word in _WORD_PATTERN.findall(text or "")}
+
+
+@dataclass
+class BudgetReport:
+    budget: int
+    used: int = 0
+    kept: int = 0
+    duplicates: Counter = field(default_factory=Counter)
+    over_budget: Counter = field(default_factory=Counter)
+
+    def describe(self) -> str:
+        parts = [f"Kept {self.kept} passages (~{self.used}/{self.budget} tokens)"]
+        if self.duplicates:
+            parts.append("dropped duplicates: " + ", ".join(f"{src}×{n}" for src, n in sorted(self.duplicates.items())))
+        if self.over_budget:
+            parts.append("dropped over budget: " + ", ".join(f"{src}×{n}" for src, n in sorted(self.over_budget.items())))
+        return "; ".join(parts)
+
+
+class ContextBudgeter:
+    """
+    Dedupes retrieved passages and fills a token budget in relevance order.
+
+    `pinned` text (tagged/detected card blocks, knowledge graph, player guidance, the
+    question itself) is always kept and counted first. Retrieved documents are then
+    dropped when they repeat a card already pinned, or when their words nearly match
+    a passage already kept (e.g. overlapping splitter chunks). The survivors are
+    ranked by relevance score times `SOURCE_PRIORITY` and added until the budget is
+    spent. Kept documents retain their original order within each corpus.
+    """
+
+    def __init__(self, budget_tokens: int) -> None:
+        self.budget_tokens = budget_tokens
+
+    def select(
+        self,
+        retrieved: Dict[str, List],
+        pinned: Iterable[str],
+        known_card_names: Optional[Iterable[str]] = None,
+    ) -> tuple[Dict[str, List], BudgetReport]:
+        report = BudgetReport(budget=self.budget_tokens)
+        pinned_texts = [text for text in pinned if text]
+        report.used = sum(estimate_tokens(text) for text in pinned_texts)
+        card_names = {name.casefold() for name in (known_card_names or []) if name}
+        kept_words: List[Set[str]] = [_word_set(text) for text in pinned_texts]
+
+        candidates = []
+        for source, docs in retrieved.items():
+            weight = SOURCE_PRIORITY.get(source, 0.5)
+            for rank, doc in enumerate(docs):
+                metadata = getattr(doc, "metadata", None) or {}
+                score = metadata.get("relevance_score")
+                if score is None:
+                    # No score from the store: fall back to a rank-based estimate.
+                    score = 1.0 / (rank + 1)
+                candidates.append((score * weight, source, rank, doc))
+        candidates.sort(key=lambda item: item[0], reverse=True)
+
+        keep: Dict[str, Set[int]] = {source: set() for source in retrieved}
+        for _, source, rank, doc in candidates:
+            text = getattr(doc, "page_content", "") or ""
+            if source == "cards" and self._card_name(text) in card_names:
+                report.duplicates[source] += 1
+                continue
+            words = _word_set(text)
+            if any(self._near_duplicate(words, other) for other in kept_words):
+                report.duplicates[source] += 1
+                continue
+            cost = estimate_tokens(text)
+            if report.used + cost > self.budget_tokens:
+                report.over_budget[source] += 1
+                continue
+            report.used += cost
+            report.kept += 1
+            kept_words.append(words)
+            keep[source].add(rank)
+
+        selected = {
+            source: [doc for rank, doc in enumerate(docs) if rank in keep[source]]
+            for source, docs in retrieved.items()
+        }
+        return selected, report
+
+    @staticmethod
+    def _card_name(text: str) -> str:
+        # Card documents are embedded as "{name}: {oracle_text}".
+        return text.split(":", 1)[0].strip().casefold() if ":" in text else ""
+
+    @staticmethod
+    def _near_duplicate(words: Set[str], other: Set[str]) -> bool:
+        if not words or not other:
+            return False
+        if words <= other:
+            return True
+        overlap = len(words & other) / len(words | other)
+        return overlap >= NEAR_DUPLICATE_JACCARD
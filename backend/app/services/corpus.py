@@ -0,0 +1,41 @@
+"""Tracks which ingest run produced the processed corpora on disk."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from ..core.config import get_settings
+
+
+def corpus_version_path() -> Path:
+    settings = get_settings()
+    return settings.processed_data_dir / "corpus_version.json"
+
+
+def read_corpus_version() -> str:
+    """Return the current corpus version, or "unversioned" before the first tracked ingest."""
+    path = corpus_version_path()
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return "unversioned"
+    version: Optional[str] = data.get("version") if isinstance(data, dict) else None
+    return version or "unversioned"
+
+
+def bump_corpus_version() -> str:
+    """Record a fresh corpus version after an ingest run and return it."""
+    version = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    path = corpus_version_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps({"version": version, "created_at": datetime.utcnow().isoformat()}),
+        encoding="utf-8",
+    )
+    tmp_path.replace(path)
+    return version
@@ -1,12 +1,69 @@
 from __future__ import annotations
 
-import json
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ..core.config import get_settings
+from .json_stream import iter_json_array, resolve_dump
+
+
+# "1. Game Concepts", "100. General", "100.1. These Magic rules..." end the id with a
+# period; lettered subrules ("100.1a A two-player game...") do not.
+RULE_LINE_PATTERN = re.compile(r"^(?:(?P<id>\d{1,3}(?:\.\d+)?)\.|(?P<subrule>\d{3}\.\d+[a-z]))\s+(?P<text>.+)$")
+
+
+def parse_rule_lines(lines: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Parse Comprehensive Rules text into (identifier, text) pairs in document order.
+
+    "Example:" lines are folded into the rule above them. Identifiers repeated by the
+    table of contents keep their first position and take the body's text. Parsing
+    stops at the glossary that follows the numbered rules.
+    """
+    entries: Dict[str, str] = {}
+    last: Optional[str] = None
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        if line == "Glossary" and last is not None and "." in last:
+            # Glossary senses are numbered "1.", "2." and would overwrite chapter titles.
+            break
+        match = RULE_LINE_PATTERN.match(line)
+        if match:
+            last = match.group("id") or match.group("subrule")
+            entries[last] = match.group("text")
+        elif last is not None and line.startswith("Example:"):
+            entries[last] = f"{entries[last]}\n{line}"
+    return list(entries.items())
+
+
+def rule_parent(identifier: str) -> Optional[str]:
+    """"702.22a" -> "702.22" -> "702" -> "7" -> None."""
+    if identifier[-1:].isalpha():
+        return identifier[:-1]
+    if "." in identifier:
+        return identifier.split(".", 1)[0]
+    if len(identifier) == 3:
+        return identifier[0]
+    return None
+
+
+def card_oracle_text(card: Dict[str, Any]) -> str:
+    """
+    Oracle text of a raw Scryfall card. Multi-faced cards (transform, modal DFC,
+    adventure...) have no top-level text, so their faces' texts are joined, each
+    prefixed with the face name.
+    """
+    text = card.get("oracle_text")
+    if text:
+        return text
+    faces = [
+        f"{face.get('name')}: {face['oracle_text']}" for face in card.get("card_faces") or [] if face.get("oracle_text")
+    ]
+    return "\n//\n".join(faces)
 
 
 @dataclass
@@ -21,6 +78,7 @@ class CardEntry:
     oracle_id: Optional[str]
     type_line: Optional[str]
     oracle_text: Optional[str]
+    layout: Optional[str] = None
 
 
 @dataclass
@@ -34,8 +92,8 @@ class DataStore:
     def __init__(self) -> None:
         settings = get_settings()
         self.rules_path = settings.raw_data_dir / "MagicCompRules 20251114.txt"
-        self.cards_path = settings.raw_data_dir / "oracle-cards-20251221100301.json"
-        self.rulings_path = settings.raw_data_dir / "rulings-20251221100031.json"
+        self.cards_path = resolve_dump(settings.raw_data_dir / "oracle-cards-20251221100301.json")
+        self.rulings_path = resolve_dump(settings.raw_data_dir / "rulings-20251221100031.json")
 
         self.rules: List[RuleEntry] = []
         self.cards: List[CardEntry] = []
@@ -47,40 +105,26 @@ class DataStore:
         self.rulings = self._load_rulings(self.rulings_path)
 
     def _load_rules(self, path: Path) -> List[RuleEntry]:
-        entries: List[RuleEntry] = []
-        rule_pattern = re.compile(r"^(?P<id>\d{1,3}(?:\.\d+[a-z]?)?)\.\s+(?P<text>.+)$")
         with path.open("r", encoding="utf-8", errors="ignore") as handle:
-            for line in handle:
-                match = rule_pattern.match(line.strip())
-                if match:
-                    entries.append(
-                        RuleEntry(
-                            identifier=match.group("id"),
-                            text=match.group("text"),
-                        )
-                    )
-        return entries
+            return [RuleEntry(identifier=identifier, text=text) for identifier, text in parse_rule_lines(handle)]
 
     def _load_cards(self, path: Path) -> List[CardEntry]:
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
         cards: List[CardEntry] = []
-        for card in payload:
+        for card in iter_json_array(path):
             cards.append(
                 CardEntry(
                     name=card.get("name"),
                     oracle_id=card.get("oracle_id"),
                     type_line=card.get("type_line"),
-                    oracle_text=card.get("oracle_text"),
+                    oracle_text=card_oracle_text(card),
+                    layout=card.get("layout"),
                 )
             )
         return cards
 
     def _load_rulings(self, path: Path) -> List[RulingEntry]:
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
         entries: List[RulingEntry] = []
-        for ruling in payload:
+        for ruling in iter_json_array(path):
             entries.append(
                 RulingEntry(
                     oracle_id=ruling.get("oracle_id"),
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import get_settings
+
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# "torch" runs sentence-transformers; the ONNX backends need `scripts/export_onnx_embeddings.py` first.
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_MODEL_FILES = {"onnx": "model.onnx", "onnx-int8": "model.int8.onnx"}
+
+# Per-process model used by ingest embedding workers (see `init_embedding_worker`).
+_worker_embeddings = None
+
+
+class QueryEmbeddingCache:
+    """
+    LRU cache in front of an embedding function's `embed_query`.
+
+    Keys are the normalized question text (lowercased, whitespace collapsed). MiniLM's
+    tokenizer is uncased, so normalizing does not change the resulting vector.
+    """
+
+    def __init__(self, embedding_function, max_entries: int = 512) -> None:
+        self.embedding_function = embedding_function
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join((text or "").lower().split())
+
+    def embed(self, text: str) -> Tuple[List[float], bool]:
+        """Return the query vector and whether it came from the cache."""
+        key = self.normalize(text)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached, True
+        vector = self.embedding_function.embed_query(key)
+        if self.max_entries <= 0:
+            return vector, False
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class OnnxMiniLMEmbeddings:
+    """
+    MiniLM through onnxruntime with the model's own fast tokenizer.
+
+    Reproduces the sentence-transformers pipeline (newlines replaced by spaces,
+    truncation at 256 tokens, attention-masked mean pooling, L2 normalization), so the
+    fp32 export yields the same vectors as the PyTorch path and existing stores keep
+    working. The int8 export trades a small drift for speed; see
+    `scripts/benchmark_embeddings.py` for its recall against PyTorch.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        quantized: bool = False,
+        threads: Optional[int] = None,
+        batch_size: int = 64,
+        max_length: int = 256,
+    ) -> None:
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = Path(model_dir) / ONNX_MODEL_FILES["onnx-int8" if quantized else "onnx"]
+        if not model_path.exists():
+            raise FileNotFoundError(f"{model_path} not found; run scripts/export_onnx_embeddings.py")
+        self.tokenizer = Tokenizer.from_file(str(Path(model_dir) / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input_names = {item.name for item in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self.tokenizer.encode_batch(
+                [text.replace("\n", " ") for text in texts[start : start + self.batch_size]]
+            )
+            input_ids = np.asarray([encoding.ids for encoding in encodings], dtype=np.int64)
+            attention_mask = np.asarray([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feed["token_type_ids"] = np.asarray([encoding.type_ids for encoding in encodings], dtype=np.int64)
+            hidden = self.session.run(None, feed)[0]
+            mask = attention_mask[..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0]
+
+
+def create_embedding_function(backend: Optional[str] = None, threads: Optional[int] = None):
+    """
+    Build the configured embedding backend (`EMBEDDING_BACKEND`).
+
+    An ONNX backend whose runtime or exported files are missing falls back to PyTorch
+    with a log line rather than failing startup.
+    """
+    settings = get_settings()
+    backend = (backend or settings.embedding_backend).lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'; expected one of {', '.join(EMBEDDING_BACKENDS)}")
+    if backend != "torch":
+        try:
+            return OnnxMiniLMEmbeddings(
+                settings.embedding_onnx_dir, quantized=backend == "onnx-int8", threads=threads
+            )
+        except (ImportError, FileNotFoundError) as exc:
+            print(f"[melvin] {backend} embedding backend unavailable ({exc}); using PyTorch")
+    if threads:
+        try:
+            import torch
+
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    from langchain_community.embeddings import SentenceTransformerEmbeddings
+
+    return SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
+
+class EmbeddingProvider:
+    """
+    The process-wide embedding model, built on first use.
+
+    Ingest and query paths both hold this object as their `embedding_function`, so a
+    worker loads at most one model, and only once something is actually embedded
+    (opening a Chroma store does not count). Ingest worker processes still load their
+    own copy via `init_embedding_worker`.
+    """
+
+    def __init__(self, backend: Optional[str] = None) -> None:
+        self.backend = backend
+        self._embeddings = None
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+
+    def get(self):
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    started = time.monotonic()
+                    embeddings = create_embedding_function(self.backend)
+                    self.load_seconds = time.monotonic() - started
+                    self.loaded_at = time.time()
+                    self._embeddings = embeddings
+                    print(f"[melvin] Loaded {type(embeddings).__name__} embeddings in {self.load_seconds:.1f}s")
+        return self._embeddings
+
+    @property
+    def loaded(self) -> bool:
+        return self._embeddings is not None
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.get().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.get().embed_query(text)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "backend": self.backend or get_settings().embedding_backend,
+            "implementation": type(self._embeddings).__name__ if self._embeddings is not None else None,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+            "loaded_at": self.loaded_at,
+        }
+
+
+embedding_provider = EmbeddingProvider()
+
+
+def init_embedding_worker(backend: Optional[str] = None, threads: Optional[int] = 1) -> None:
+    """Process-pool initializer: load the embedding model once per worker process."""
+    global _worker_embeddings
+    # One intra-op thread per worker so N workers do not oversubscribe N cores.
+    _worker_embeddings = create_embedding_function(backend, threads=threads)
+
+
+def embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embed one batch of documents inside an ingest worker process."""
+    if _worker_embeddings is None:
+        init_embedding_worker()
+    return _worker_embeddings.embed_documents(texts)
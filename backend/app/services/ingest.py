@@ -1,19 +1,51 @@
 from __future__ import annotations
+import hashlib
 import json
+import multiprocessing
 import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Iterable
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 import os
 from collections import defaultdict
 
 from ..core.config import get_settings
+from .corpus import bump_corpus_version
+from .embeddings import embed_batch, embedding_provider, init_embedding_worker
+from .data_loader import card_oracle_text, parse_rule_lines, rule_parent
+from .json_stream import iter_json_array, resolve_dump
+from .knowledge import CARD_METADATA_FILE, LEGACY_CARD_METADATA_FILE, write_card_snapshot
+from .lexical_index import LEXICAL_INDEX_FILE, BM25Index
+from .vector_generations import GENERATION_MANIFEST, LEGACY_GENERATION, vector_generations
+from .vector_store import open_vector_store
 
-os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
-os.environ.setdefault("CHROMA_TELEMETRY_ENABLED", "False")
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
+from langchain_core.documents import Document
+
+# Bump when the way raw data is turned into chunks changes, so unchanged dumps are re-chunked.
+CHUNKING_VERSION = 4
+
+
+class IngestCancelled(Exception):
+    """Raised from inside an ingest run when its job has been asked to stop."""
+
+
+class IngestProgress:
+    """Progress sink for `IngestService.ingest`; the default ignores every update."""
+
+    def set_phase(self, phase: str, total: int = 0) -> None:
+        pass
+
+    def advance(self, count: int) -> None:
+        pass
+
+    def check_cancelled(self) -> None:
+        pass
+
 
 @dataclass
 class RuleEntry:
@@ -40,81 +72,445 @@ class IngestService:
     def __init__(self) -> None:
         settings = get_settings()
         self.rules_path = settings.raw_data_dir / "MagicCompRules 20251114.txt"
-        self.cards_path = settings.raw_data_dir / "oracle-cards-20251221100301.json"
-        self.rulings_path = settings.raw_data_dir / "rulings-20251221100031.json"
+        self.cards_path = resolve_dump(settings.raw_data_dir / "oracle-cards-20251221100301.json")
+        self.rulings_path = resolve_dump(settings.raw_data_dir / "rulings-20251221100031.json")
         self.reference_dir = settings.reference_data_dir
-        self.vectorstore_path = settings.processed_data_dir / "chroma_db"
         self.knowledge_dir = settings.processed_data_dir / "knowledge"
         self.knowledge_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = settings.processed_data_dir / "ingest_manifest.json"
+        self.write_batch_size = 1000
+        self.batch_size = max(1, settings.ingest_batch_size)
+        self.embedding_workers = settings.ingest_workers or os.cpu_count() or 1
+        self.checkpoint_seconds = 10.0
+        self.vector_store_backend = settings.vector_store_backend
+
+        self.embedding_function = embedding_provider
+        self.chunk_size = 1000
+        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=self.chunk_size, chunk_overlap=200)
+
+    def ingest(self, progress: Optional[IngestProgress] = None) -> Dict[str, Any]:
+        """
+        Bring every vector store in line with the raw dumps, embedding only what changed.
+
+        Each chunk is keyed by a hash of its content and metadata. The ids held by each
+        store live in the generation's `manifest.json`; a corpus whose source files and
+        chunking are unchanged (and whose generation was built with the configured
+        vector store backend) is skipped without parsing. Otherwise a new generation is
+        copied from the current one, only added chunks are embedded and removed chunks
+        deleted there, and the generation is swapped in once every corpus is done.
+        Returns per-corpus statistics.
+
+        `progress` receives phase/item updates and may raise `IngestCancelled` between
+        batches; everything written before that point stays checkpointed.
+        """
+        progress = progress or IngestProgress()
+        state = self._load_manifest(self.manifest_path)
+        stats: Dict[str, Any] = {}
+        loaded: Dict[str, Any] = {}
+        # Filled by the document builders: how much the pre-pass shrank each corpus.
+        prepass: Dict[str, Dict[str, int]] = {}
+
+        def cards() -> List[CardEntry]:
+            if "cards" not in loaded:
+                loaded["cards"] = self._load_cards(self.cards_path)
+            return loaded["cards"]
+
+        def rulings() -> List[RulingEntry]:
+            if "rulings" not in loaded:
+                loaded["rulings"] = self._load_rulings(self.rulings_path)
+            return loaded["rulings"]
+
+        reference_paths = sorted(self.reference_dir.glob("*.txt")) if self.reference_dir.exists() else []
+        corpora = [
+            ("rules", [self.rules_path], lambda: self._rule_documents(self._load_rules(self.rules_path))),
+            ("cards", [self.cards_path], lambda: self._card_documents(cards(), prepass.setdefault("cards", {}))),
+            (
+                "rulings",
+                [self.rulings_path, self.cards_path],
+                lambda: self._ruling_documents(rulings(), cards(), prepass.setdefault("rulings", {})),
+            ),
+            ("reference", reference_paths, lambda: self._reference_documents(self._load_reference_docs())),
+        ]
+        current = vector_generations.current()
+        current_manifest = self._current_generation_manifest(current, state)
+        same_backend = current_manifest.get("backend", "chroma") == self.vector_store_backend
+        pending = []
+        for name, sources, build_documents in corpora:
+            fingerprint = self._fingerprint(name, sources)
+            up_to_date = same_backend and current_manifest["corpora"].get(name, {}).get("fingerprint") == fingerprint
+            if up_to_date and (current[1] / name / LEXICAL_INDEX_FILE).exists():
+                stats[name] = {"skipped": True}
+            else:
+                pending.append((name, fingerprint, build_documents))
+
+        if pending:
+            # Build into a separate generation; live queries keep reading `current` until it is swapped in.
+            generation, root = self._building_generation(current, current_manifest)
+            manifest_path = root / GENERATION_MANIFEST
+            manifest = self._load_manifest(manifest_path)
+            with ExitStack() as stack:
+                pool: Optional[ProcessPoolExecutor] = None
+                for name, fingerprint, build_documents in pending:
+                    if manifest["corpora"].get(name, {}).get("fingerprint") == fingerprint:
+                        # Finished by an earlier, interrupted run of this same build.
+                        stats[name] = {"skipped": True, "resumed": True}
+                        continue
+                    progress.set_phase(f"parsing {name}")
+                    documents = build_documents()
+                    progress.check_cancelled()
+                    if pool is None:
+                        pool = stack.enter_context(self._embedding_pool())
+                    if name in prepass:
+                        self._log_prepass(name, prepass[name])
+                    stats[name] = self._sync_corpus(name, documents, manifest, root, pool, progress)
+                    stats[name].update(prepass.get(name, {}))
+                    manifest["corpora"][name]["fingerprint"] = fingerprint
+                    self._write_manifest(manifest, manifest_path)
+            vector_generations.activate(generation)
+            stats["generation"] = generation
+
+        metadata_target = self.knowledge_dir / CARD_METADATA_FILE
+        metadata_fingerprint = self._fingerprint("card_metadata", [self.cards_path, self.rulings_path])
+        metadata_changed = False
+        if metadata_target.exists() and state.get("card_metadata") == metadata_fingerprint:
+            stats["card_metadata"] = {"skipped": True}
+        else:
+            progress.set_phase("card metadata")
+            # Streams the dump again rather than keeping every raw card object alive.
+            card_metadata = self._build_card_metadata(iter_json_array(self.cards_path), rulings())
+            self._write_card_metadata(card_metadata)
+            state["card_metadata"] = metadata_fingerprint
+            self._write_manifest(state, self.manifest_path)
+            stats["card_metadata"] = {"cards": len(card_metadata)}
+            metadata_changed = True
+
+        vector_generations.collect_garbage()
+        if pending or metadata_changed:
+            stats["corpus_version"] = bump_corpus_version()
+        return stats
+
+    def _current_generation_manifest(self, current: Tuple[str, Path], state: Dict[str, Any]) -> Dict[str, Any]:
+        generation, root = current
+        if generation == LEGACY_GENERATION:
+            # Stores from before generations existed were tracked in the top-level manifest.
+            return {"corpora": state.get("corpora", {})}
+        return self._load_manifest(root / GENERATION_MANIFEST)
+
+    def _building_generation(self, current: Tuple[str, Path], current_manifest: Dict[str, Any]) -> Tuple[str, Path]:
+        """Resume the unfinished build on top of `current`, or start a new one copied from it."""
+        building = vector_generations.building()
+        if building is not None:
+            manifest = self._load_manifest(building[1] / GENERATION_MANIFEST)
+            if manifest.get("base") == current[0] and manifest.get("backend", "chroma") == self.vector_store_backend:
+                print(f"[melvin] Resuming vector store generation {building[0]}")
+                return building
+            vector_generations.discard(building[0])
+        # Stores from another backend cannot be reused; every corpus is then rebuilt from scratch.
+        same_backend = current_manifest.get("backend", "chroma") == self.vector_store_backend
+        generation, root = vector_generations.create(current, copy=same_backend)
+        manifest = {
+            "base": current[0],
+            "backend": self.vector_store_backend,
+            "corpora": json.loads(json.dumps(current_manifest["corpora"])) if same_backend else {},
+        }
+        self._write_manifest(manifest, root / GENERATION_MANIFEST)
+        return generation, root
+
+    def _rule_documents(self, rules: List[RuleEntry]) -> List[Document]:
+        """
+        One document per numbered rule or subrule, tagged with where it sits in the CR.
+
+        Chapter ("7") and section ("702") headings only contribute their titles as
+        metadata. A rule longer than the splitter's chunk size is still split, with
+        every piece carrying the same metadata.
+        """
+        titles = {rule.identifier: rule.text for rule in rules if "." not in rule.identifier}
+        documents: List[Document] = []
+        for rule in rules:
+            if "." not in rule.identifier:
+                continue
+            section = rule.identifier.split(".", 1)[0]
+            chapter = section[0]
+            metadata = {
+                "source": "comprehensive_rules",
+                "rule_id": rule.identifier,
+                "parent_id": rule_parent(rule.identifier) or "",
+                "section": section,
+                "section_title": titles.get(section, ""),
+                "chapter": chapter,
+                "chapter_title": titles.get(chapter, ""),
+            }
+            content = f"{rule.identifier}: {rule.text}"
+            if len(content) > self.chunk_size:
+                documents.extend(self.text_splitter.create_documents([content], metadatas=[metadata]))
+            else:
+                documents.append(Document(page_content=content, metadata=metadata))
+        return documents
 
-        self.embedding_function = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        self._raw_card_payload: List[Dict[str, Any]] = []
+    def _card_documents(self, cards: List[CardEntry], report: Optional[Dict[str, int]] = None) -> List[Document]:
+        """One "Name: text" document per card; cards without any Oracle text (vanilla, art cards) are skipped."""
+        cards_texts = [f"{card.name}: {card.oracle_text}" for card in cards if card.name and card.oracle_text]
+        documents = self.text_splitter.create_documents(cards_texts)
+        if report is not None:
+            report.update(
+                {"source_items": len(cards), "skipped_empty": len(cards) - len(cards_texts), "documents": len(documents)}
+            )
+        return documents
 
-    def ingest(self) -> None:
-        rules = self._load_rules(self.rules_path)
-        cards = self._load_cards(self.cards_path)
-        rulings = self._load_rulings(self.rulings_path)
-        reference_docs = self._load_reference_docs()
+    def _ruling_documents(
+        self, rulings: List[RulingEntry], cards: List[CardEntry], report: Optional[Dict[str, int]] = None
+    ) -> List[Document]:
+        """
+        One document per distinct ruling text, tagged with every card it applies to.
 
-        rules_texts = [f"{rule.identifier}: {rule.text}" for rule in rules]
-        cards_texts = [f"{card.name}: {card.oracle_text}" for card in cards]
-        rulings_texts = [f"{ruling.comment}" for ruling in rulings]
+        Scryfall repeats the same comment across many oracle_ids, so rulings are merged
+        on their whitespace-normalized text. `oracle_ids` lists every card ("|"-joined,
+        see `document_oracle_ids`); `oracle_id` and `card_name` name the first one, and
+        `published_at` is the newest date.
+        """
+        names = {card.oracle_id: card.name for card in cards if card.oracle_id and card.name}
+        merged: Dict[str, Dict[str, Any]] = {}
+        empty = 0
+        for ruling in rulings:
+            text = (ruling.comment or "").strip()
+            if not text:
+                empty += 1
+                continue
+            entry = merged.setdefault(" ".join(text.split()), {"text": text, "oracle_ids": {}, "published_at": ""})
+            if ruling.oracle_id:
+                entry["oracle_ids"][ruling.oracle_id] = None
+            entry["published_at"] = max(entry["published_at"], ruling.published_at or "")
+        texts: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        for entry in merged.values():
+            oracle_ids = list(entry["oracle_ids"])
+            first = oracle_ids[0] if oracle_ids else ""
+            texts.append(entry["text"])
+            metadatas.append(
+                {
+                    "oracle_id": first,
+                    "oracle_ids": "|".join(oracle_ids),
+                    "card_name": names.get(first, ""),
+                    "published_at": entry["published_at"],
+                }
+            )
+        documents = self.text_splitter.create_documents(texts, metadatas=metadatas)
+        if report is not None:
+            report.update(
+                {
+                    "source_items": len(rulings),
+                    "skipped_empty": empty,
+                    "merged_duplicates": len(rulings) - empty - len(merged),
+                    "documents": len(documents),
+                }
+            )
+        return documents
+
+    @staticmethod
+    def _log_prepass(name: str, report: Dict[str, int]) -> None:
+        source, documents = report.get("source_items", 0), report.get("documents", 0)
+        shrink = 100.0 * (1 - documents / source) if source else 0.0
+        print(
+            f"[melvin] Ingest {name}: {source} source items -> {documents} chunks ({shrink:.1f}% fewer; "
+            f"{report.get('skipped_empty', 0)} empty skipped, {report.get('merged_duplicates', 0)} duplicates merged)"
+        )
+
+    def _reference_documents(self, reference_docs: List[dict]) -> List[Document]:
+        if not reference_docs:
+            return []
         reference_texts = [doc["text"] for doc in reference_docs]
         reference_meta = [doc["metadata"] for doc in reference_docs]
-        
-        rules_chunks = self.text_splitter.create_documents(rules_texts)
-        cards_chunks = self.text_splitter.create_documents(cards_texts)
-        rulings_chunks = self.text_splitter.create_documents(rulings_texts)
-        reference_chunks = []
-        if reference_texts:
-            reference_chunks = self.text_splitter.create_documents(reference_texts, metadatas=reference_meta)
-
-        Chroma.from_documents(rules_chunks, self.embedding_function, persist_directory=str(self.vectorstore_path / "rules"))
-        Chroma.from_documents(cards_chunks, self.embedding_function, persist_directory=str(self.vectorstore_path / "cards"))
-        Chroma.from_documents(rulings_chunks, self.embedding_function, persist_directory=str(self.vectorstore_path / "rulings"))
-        if reference_chunks:
-            Chroma.from_documents(reference_chunks, self.embedding_function, persist_directory=str(self.vectorstore_path / "reference"))
-
-        card_metadata = self._build_card_metadata(self._raw_card_payload, rulings)
-        self._write_card_metadata(card_metadata)
+        return self.text_splitter.create_documents(reference_texts, metadatas=reference_meta)
+
+    @staticmethod
+    def chunk_id(document: Document) -> str:
+        """Stable id for a chunk: identical text and metadata always hash the same."""
+        digest = hashlib.sha256()
+        digest.update(document.page_content.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(document.metadata or {}, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _sync_corpus(
+        self,
+        name: str,
+        documents: List[Document],
+        manifest: Dict[str, Any],
+        root: Path,
+        pool: Optional[ProcessPoolExecutor] = None,
+        progress: Optional[IngestProgress] = None,
+    ) -> Dict[str, Any]:
+        """
+        Embed chunks missing from the store and delete chunks no longer produced.
+
+        New chunks are embedded in `batch_size` batches (on `pool` when given) and each
+        batch is written to the store as soon as it completes. The manifest doubles as
+        the checkpoint: every `checkpoint_seconds` the store is flushed and the manifest
+        rewritten with the ids stored so far, so an interrupted run resumes with only
+        the missing chunks. Once every chunk is written the store is compacted.
+        """
+        by_id: Dict[str, Document] = {}
+        for document in documents:
+            by_id.setdefault(self.chunk_id(document), document)
+
+        entry = manifest["corpora"].get(name)
+        store = open_vector_store(root / name, self.vector_store_backend, self.embedding_function)
+        if entry is not None and entry.get("ids") and store.count() == 0:
+            print(f"[melvin] Ingest {name}: store is empty but the manifest lists chunks; rebuilding")
+            entry = None
+        if entry is None:
+            # No record of what this store holds (first run or pre-manifest store): start clean.
+            store.reset()
+            previous: set[str] = set()
+        else:
+            previous = set(entry.get("ids", []))
+
+        current = set(by_id)
+        added = sorted(current - previous)
+        removed = sorted(previous - current)
+        stored = set(previous)
+        for start in range(0, len(removed), self.write_batch_size):
+            batch = removed[start : start + self.write_batch_size]
+            store.delete(batch)
+            stored.difference_update(batch)
+        store.flush()
+        manifest["corpora"][name] = {"ids": sorted(stored)}
+        self._write_manifest(manifest, root / GENERATION_MANIFEST)
+
+        progress = progress or IngestProgress()
+        progress.set_phase(f"embedding {name}", total=len(added))
+        started = time.monotonic()
+        last_checkpoint = started
+        embedded = 0
+        batches = [added[start : start + self.batch_size] for start in range(0, len(added), self.batch_size)]
+        try:
+            for ids, vectors in self._embed_batches(batches, by_id, pool):
+                store.upsert(ids, [by_id[chunk] for chunk in ids], vectors)
+                stored.update(ids)
+                embedded += len(ids)
+                progress.advance(len(ids))
+                now = time.monotonic()
+                if now - last_checkpoint >= self.checkpoint_seconds:
+                    store.flush()
+                    manifest["corpora"][name] = {"ids": sorted(stored)}
+                    self._write_manifest(manifest, root / GENERATION_MANIFEST)
+                    last_checkpoint = now
+                    rate = embedded / max(now - started, 1e-6)
+                    print(f"[melvin] Ingest {name}: {embedded}/{len(added)} chunks embedded ({rate:.1f} docs/s)")
+                progress.check_cancelled()
+        finally:
+            # Also runs on cancellation/failure so the next ingest resumes from here.
+            store.flush()
+            manifest["corpora"][name] = {"ids": sorted(stored)}
+            self._write_manifest(manifest, root / GENERATION_MANIFEST)
+        store.compact()
+
+        elapsed = time.monotonic() - started
+        rate = embedded / elapsed if elapsed > 0 else 0.0
+        progress.set_phase(f"indexing {name}")
+        # Rebuilt from every current chunk; cheap next to embedding and avoids incremental bookkeeping.
+        BM25Index.build(list(by_id), [document.page_content for document in by_id.values()]).save(
+            root / name / LEXICAL_INDEX_FILE
+        )
+        if added:
+            print(f"[melvin] Ingest {name}: embedded {embedded} chunks in {elapsed:.1f}s ({rate:.1f} docs/s)")
+        return {
+            "added": len(added),
+            "removed": len(removed),
+            "unchanged": len(current & previous),
+            "seconds": round(elapsed, 2),
+            "docs_per_second": round(rate, 1),
+        }
+
+    def _embed_batches(
+        self,
+        batches: List[List[str]],
+        by_id: Dict[str, Document],
+        pool: Optional[ProcessPoolExecutor],
+    ) -> Iterator[Tuple[List[str], List[List[float]]]]:
+        """Yield (ids, vectors) per batch, in completion order when running on a pool."""
+        if pool is None:
+            for ids in batches:
+                yield ids, self.embedding_function.embed_documents([by_id[chunk].page_content for chunk in ids])
+            return
+        pending: Dict[Future, List[str]] = {}
+        queue = iter(batches)
+        max_in_flight = self.embedding_workers * 2
+        while True:
+            while len(pending) < max_in_flight:
+                ids = next(queue, None)
+                if ids is None:
+                    break
+                pending[pool.submit(embed_batch, [by_id[chunk].page_content for chunk in ids])] = ids
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+    @contextmanager
+    def _embedding_pool(self) -> Iterator[Optional[ProcessPoolExecutor]]:
+        """Process pool of embedding workers, or None to embed in this process."""
+        if self.embedding_workers <= 1:
+            yield None
+            return
+        # spawn, not fork: forking a process that already holds torch threads can deadlock.
+        pool = ProcessPoolExecutor(
+            max_workers=self.embedding_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_embedding_worker,
+            initargs=(get_settings().embedding_backend,),
+        )
+        try:
+            yield pool
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def _fingerprint(self, name: str, sources: List[Path]) -> str:
+        """Cheap change detector: chunking version plus size and mtime of every source file."""
+        parts = [name, str(CHUNKING_VERSION)]
+        for source in sources:
+            try:
+                stat = source.stat()
+            except FileNotFoundError:
+                parts.append(f"{source.name}:missing")
+                continue
+            parts.append(f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}")
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _load_manifest(self, path: Path) -> Dict[str, Any]:
+        try:
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+        manifest.setdefault("corpora", {})
+        return manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any], path: Path) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+        tmp_path.replace(path)
 
     def _load_rules(self, path: Path) -> List[RuleEntry]:
-        entries: List[RuleEntry] = []
-        rule_pattern = re.compile(r"^(?P<id>\d{1,3}(?:\.\d+[a-z]?)?)\.\s+(?P<text>.+)$")
         with path.open("r", encoding="utf-8", errors="ignore") as handle:
-            for line in handle:
-                match = rule_pattern.match(line.strip())
-                if match:
-                    entries.append(
-                        RuleEntry(
-                            identifier=match.group("id"),
-                            text=match.group("text"),
-                        )
-                    )
-        return entries
+            return [RuleEntry(identifier=identifier, text=text) for identifier, text in parse_rule_lines(handle)]
 
     def _load_cards(self, path: Path) -> List[CardEntry]:
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
-        self._raw_card_payload = payload
         cards: List[CardEntry] = []
-        for card in payload:
+        for card in iter_json_array(path):
             cards.append(
                 CardEntry(
                     name=card.get("name"),
                     oracle_id=card.get("oracle_id"),
                     type_line=card.get("type_line"),
-                    oracle_text=card.get("oracle_text"),
+                    oracle_text=card_oracle_text(card),
                 )
             )
         return cards
 
     def _load_rulings(self, path: Path) -> List[RulingEntry]:
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
         entries: List[RulingEntry] = []
-        for ruling in payload:
+        for ruling in iter_json_array(path):
             entries.append(
                 RulingEntry(
                     oracle_id=ruling.get("oracle_id"),
@@ -148,7 +544,7 @@ class IngestService:
             name = card.get("name")
             if not name:
                 continue
-            oracle_text = card.get("oracle_text") or ""
+            oracle_text = card_oracle_text(card)
             oracle_id = card.get("oracle_id")
             related_rules = sorted(set(rule_pattern.findall(oracle_text)))
             entry = {
@@ -171,7 +567,18 @@ class IngestService:
         return metadata
 
     def _write_card_metadata(self, metadata: Dict[str, Dict[str, Any]]) -> None:
-        target = self.knowledge_dir / "card_metadata.json"
-        target.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        write_card_snapshot(metadata, self.knowledge_dir / CARD_METADATA_FILE)
+        # The JSON file it replaces can run to hundreds of MB; nothing reads it once the snapshot exists.
+        (self.knowledge_dir / LEGACY_CARD_METADATA_FILE).unlink(missing_ok=True)
+
+_ingest_service: IngestService | None = None
+_ingest_lock = threading.Lock()
+
 
-ingest_service = IngestService()
+def get_ingest_service() -> IngestService:
+    global _ingest_service
+    if _ingest_service is None:
+        with _ingest_lock:
+            if _ingest_service is None:
+                _ingest_service = IngestService()
+    return _ingest_service
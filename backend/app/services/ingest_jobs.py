@@ -0,0 +1,280 @@
+"""Runs ingest as a single-flight background job with pollable progress."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts
+    fcntl = None
+
+from ..core.config import get_settings
+from .ingest import IngestCancelled, IngestProgress, get_ingest_service
+
+ACTIVE_STATUSES = {"queued", "running"}
+# Seconds between status file writes while a phase is advancing.
+STATUS_WRITE_INTERVAL = 1.0
+# How long a submit waits for another worker that just took the lock to record its job id.
+OWNER_WAIT_SECONDS = 1.0
+
+
+def jobs_dir() -> Path:
+    """Status and cancel files, next to the ingest lock so every API worker sees them."""
+    return get_settings().processed_data_dir / "ingest_jobs"
+
+
+class IngestJob(IngestProgress):
+    """
+    One ingest run; the ingest service reports into it while it executes.
+
+    Progress is mirrored to `<jobs_dir>/<id>.json` so any worker process can answer a
+    status poll, and a `<id>.cancel` file written by any worker stops the run at its
+    next `check_cancelled`.
+    """
+
+    def __init__(self) -> None:
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.phase = "queued"
+        self.processed = 0
+        self.total = 0
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._phase_started = time.monotonic()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self.status_path = jobs_dir() / f"{self.id}.json"
+        self.cancel_path = jobs_dir() / f"{self.id}.cancel"
+
+    def set_phase(self, phase: str, total: int = 0) -> None:
+        with self._lock:
+            self.phase = phase
+            self.processed = 0
+            self.total = total
+            self._phase_started = time.monotonic()
+        self.write_status()
+
+    def advance(self, count: int) -> None:
+        with self._lock:
+            self.processed += count
+        if time.monotonic() - self._last_write >= STATUS_WRITE_INTERVAL:
+            self.write_status()
+
+    def check_cancelled(self) -> None:
+        if not self._cancel.is_set() and self.cancel_path.exists():
+            self._cancel.set()
+        if self._cancel.is_set():
+            raise IngestCancelled()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        request_cancel(self.id)
+
+    def write_status(self) -> None:
+        """Replace the status file with the current snapshot (best effort)."""
+        self._last_write = time.monotonic()
+        try:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.status_path.with_name(f"{self.status_path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+            tmp_path.replace(self.status_path)
+        except OSError as exc:
+            print(f"[melvin] Could not write ingest job status {self.status_path}: {exc}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = time.monotonic() - self._phase_started
+            throughput = self.processed / elapsed if self.processed and elapsed > 0 else 0.0
+            eta = None
+            if self.status == "running" and self.total and throughput:
+                eta = round(max(self.total - self.processed, 0) / throughput, 1)
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "phase": self.phase,
+                "processed": self.processed,
+                "total": self.total,
+                "items_per_second": round(throughput, 1),
+                "eta_seconds": eta,
+                "cancel_requested": self._cancel.is_set(),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+def read_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """The last status written for `job_id` by whichever process ran it."""
+    if not job_id.isalnum():
+        return None
+    try:
+        return json.loads((jobs_dir() / f"{job_id}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def request_cancel(job_id: str) -> None:
+    try:
+        (jobs_dir() / f"{job_id}.cancel").touch()
+    except OSError as exc:
+        print(f"[melvin] Could not request cancel of ingest job {job_id}: {exc}")
+
+
+class IngestJobManager:
+    """
+    Starts ingest jobs on a background thread, at most one at a time.
+
+    Submitting while a job is active returns that job instead of starting another.
+    A file lock under the processed data directory extends the guarantee across API
+    worker processes, since they all share the same Chroma directories: `submit` takes
+    it before creating a job and writes the job id into the lock file, so a submit that
+    finds it held returns the owning worker's job. Status and cancel go through files
+    in `jobs_dir()`, so a poll or cancel may land on any worker.
+    """
+
+    def __init__(self, history: int = 20) -> None:
+        self.history = history
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._active: Optional[IngestJob] = None
+        self._lock = threading.Lock()
+
+    def submit(self) -> Tuple[Dict[str, Any], bool]:
+        """Return (job snapshot, started): the new job, or the one in flight in any worker."""
+        with self._lock:
+            if self._active is not None and self._active.status in ACTIVE_STATUSES:
+                return self._active.snapshot(), False
+            handle = self._acquire_process_lock()
+            if handle is None:
+                return self._foreign_job(), False
+            job = IngestJob()
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+            # Status file first, so a worker that reads the id from the lock file can always load it.
+            job.write_status()
+            handle.seek(0)
+            handle.truncate()
+            handle.write(job.id)
+            handle.flush()
+        self._prune_files()
+        thread = threading.Thread(
+            target=self._run, args=(job, handle), name=f"melvin-ingest-{job.id[:8]}", daemon=True
+        )
+        thread.start()
+        return job.snapshot(), True
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job started by this process, else its status file."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        return read_status(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.get(job_id)
+        if job is not None:
+            if job.status in ACTIVE_STATUSES:
+                job.cancel()
+            return job.snapshot()
+        snapshot = read_status(job_id)
+        if snapshot is not None and snapshot.get("status") in ACTIVE_STATUSES:
+            # The owning worker sees the flag at its next batch and records the cancellation.
+            request_cancel(job_id)
+            snapshot["cancel_requested"] = True
+        return snapshot
+
+    def _prune_files(self) -> None:
+        """Keep the status files of the newest `history` jobs."""
+        try:
+            paths = sorted(jobs_dir().glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+            for path in paths[self.history :]:
+                path.unlink(missing_ok=True)
+                path.with_suffix(".cancel").unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def _run(self, job: IngestJob, handle: IO[str]) -> None:
+        job.started_at = time.time()
+        job.status = "running"
+        job.write_status()
+        try:
+            job.check_cancelled()
+            job.result = get_ingest_service().ingest(progress=job)
+            job.status = "completed"
+            job.phase = "done"
+        except IngestCancelled:
+            job.status = "cancelled"
+            print(f"[melvin] Ingest job {job.id} cancelled during '{job.phase}'")
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+            print(f"[melvin] Ingest job {job.id} failed: {exc}")
+        finally:
+            job.finished_at = time.time()
+            job.write_status()
+            job.cancel_path.unlink(missing_ok=True)
+            self._release_process_lock(handle)
+
+    @staticmethod
+    def _lock_path() -> Path:
+        return get_settings().processed_data_dir / "ingest.lock"
+
+    def _acquire_process_lock(self) -> Optional[IO[str]]:
+        """Open and lock `ingest.lock`, or None when another process holds it."""
+        lock_path = self._lock_path()
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        handle = lock_path.open("a+")
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                return None
+        return handle
+
+    @staticmethod
+    def _release_process_lock(handle: IO[str]) -> None:
+        try:
+            handle.seek(0)
+            handle.truncate()
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            handle.close()
+
+    def _foreign_job(self) -> Dict[str, Any]:
+        """Status of the job another worker is running, as recorded in the lock file."""
+        deadline = time.monotonic() + OWNER_WAIT_SECONDS
+        while True:
+            try:
+                job_id = self._lock_path().read_text(encoding="utf-8").strip()
+            except OSError:
+                job_id = ""
+            snapshot = read_status(job_id) if job_id else None
+            if snapshot is not None:
+                return snapshot
+            if time.monotonic() >= deadline:
+                # The owner took the lock but has not recorded its job yet.
+                return {"job_id": job_id or None, "status": "running", "phase": "starting"}
+            time.sleep(0.05)
+
+
+ingest_jobs = IngestJobManager()
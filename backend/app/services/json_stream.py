@@ -0,0 +1,108 @@
+"""Incremental reading of large (optionally compressed) Scryfall JSON array dumps."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+_READ_CHUNK_CHARS = 1 << 20
+_WHITESPACE = " \t\n\r"
+
+
+def resolve_dump(path: Path) -> Path:
+    """Return `path`, or its `.gz` / `.zst` sibling when only a compressed copy exists."""
+    if path.exists():
+        return path
+    for suffix in COMPRESSED_SUFFIXES:
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def open_dump(path: Path) -> TextIO:
+    """Open a dump as UTF-8 text, decompressing gzip or zstd by file suffix."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError(f"Reading {path.name} requires the 'zstandard' package") from exc
+        raw = path.open("rb")
+        # max_window_size covers dumps compressed with --long.
+        reader = zstandard.ZstdDecompressor(max_window_size=2**31).stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def iter_json_array(path: Path, chunk_chars: int = _READ_CHUNK_CHARS) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array one at a time.
+
+    Only the item being decoded (plus one read chunk) is held in memory, so peak usage
+    no longer scales with the size of the dump.
+    """
+    decoder = json.JSONDecoder()
+    with open_dump(path) as handle:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def refill() -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            more = handle.read(chunk_chars)
+            if not more:
+                eof = True
+                return False
+            buffer = buffer[pos:] + more
+            pos = 0
+            return True
+
+        def next_token() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not refill():
+                    return ""
+
+        if next_token() != "[":
+            raise ValueError(f"{path.name} is not a JSON array")
+        pos += 1
+        expect_item = True
+        while True:
+            token = next_token()
+            if token == "]":
+                return
+            if not token:
+                raise ValueError(f"{path.name} ended before the JSON array was closed")
+            if not expect_item:
+                if token != ",":
+                    raise ValueError(f"{path.name}: expected ',' between array items")
+                pos += 1
+                expect_item = True
+                continue
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if refill():
+                        continue
+                    raise
+                # A scalar cut at the chunk boundary still decodes; make sure it is whole.
+                if end == len(buffer) and refill():
+                    continue
+                break
+            pos = end
+            expect_item = False
+            yield item
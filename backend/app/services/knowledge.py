@@ -1,31 +1,162 @@
 from __future__ import annotations
 
 import json
+import mmap
+import struct
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+import msgpack
+
 from ..core.config import get_settings
 
 
+CARD_METADATA_FILE = "card_metadata.bin"
+# Written by ingest before the binary snapshot existed; read only until the next ingest.
+LEGACY_CARD_METADATA_FILE = "card_metadata.json"
+_MAGIC = b"MLVNCM01"
+# magic, card count, byte offset of the first record
+_HEADER = struct.Struct("<8sQQ")
+_OFFSET = struct.Struct("<Q")
+# Seconds between checks for a snapshot rewritten by ingest.
+SNAPSHOT_CHECK_INTERVAL = 5.0
+# A replaced snapshot is unmapped this long after the swap, once lookups holding it are done.
+SNAPSHOT_CLOSE_DELAY = 30.0
+
+
+def write_card_snapshot(metadata: Dict[str, Dict[str, Any]], path: Path) -> None:
+    """
+    Write card metadata (keyed by lowercased name) as an indexed binary snapshot.
+
+    Layout: header, key offsets and record offsets (count + 1 little-endian uint64
+    each), the UTF-8 keys in byte order, then one msgpack record per key. Readers
+    binary-search the keys in place and unpack only the record they need.
+    """
+    keys = sorted(metadata, key=lambda key: key.encode("utf-8"))
+    encoded_keys = [key.encode("utf-8") for key in keys]
+    records = [msgpack.packb(metadata[key], use_bin_type=True) for key in keys]
+    count = len(keys)
+    keys_start = _HEADER.size + 2 * _OFFSET.size * (count + 1)
+    records_start = keys_start + sum(len(key) for key in encoded_keys)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, count, records_start))
+        for blobs in (encoded_keys, records):
+            position = 0
+            handle.write(_OFFSET.pack(position))
+            for blob in blobs:
+                position += len(blob)
+                handle.write(_OFFSET.pack(position))
+        for blob in encoded_keys:
+            handle.write(blob)
+        for blob in records:
+            handle.write(blob)
+    tmp_path.replace(path)
+
+
+class CardSnapshot:
+    """Read side of `write_card_snapshot` over an mmap; opening reads only the header."""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as handle:
+            self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._records_start = _HEADER.unpack_from(self._data, 0)
+        if magic != _MAGIC:
+            self._data.close()
+            raise ValueError(f"{path} is not a card metadata snapshot")
+        self._key_offsets = _HEADER.size
+        self._record_offsets = self._key_offsets + _OFFSET.size * (self.count + 1)
+        self._keys_start = self._record_offsets + _OFFSET.size * (self.count + 1)
+
+    def _offset(self, table: int, index: int) -> int:
+        return _OFFSET.unpack_from(self._data, table + index * _OFFSET.size)[0]
+
+    def _key(self, index: int) -> bytes:
+        start = self._keys_start + self._offset(self._key_offsets, index)
+        end = self._keys_start + self._offset(self._key_offsets, index + 1)
+        return self._data[start:end]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        target = key.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count or self._key(low) != target:
+            return None
+        start = self._records_start + self._offset(self._record_offsets, low)
+        end = self._records_start + self._offset(self._record_offsets, low + 1)
+        return msgpack.unpackb(self._data[start:end], raw=False)
+
+    def close(self) -> None:
+        self._data.close()
+
+
 class KnowledgeStore:
     def __init__(self) -> None:
         settings = get_settings()
-        self.metadata_path = settings.processed_data_dir / "knowledge" / "card_metadata.json"
+        knowledge_dir = settings.processed_data_dir / "knowledge"
+        self.metadata_path = knowledge_dir / CARD_METADATA_FILE
+        self.legacy_metadata_path = knowledge_dir / LEGACY_CARD_METADATA_FILE
+        self._snapshot: Optional[CardSnapshot] = None
+        self._snapshot_stamp: Optional[int] = None
         self._card_cache: Dict[str, Dict[str, Any]] | None = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
 
-    def _ensure_loaded(self) -> None:
-        if self._card_cache is not None:
-            return
+    def _stamp(self) -> Optional[int]:
         try:
-            self._card_cache = json.loads(self.metadata_path.read_text(encoding="utf-8"))
+            return self.metadata_path.stat().st_mtime_ns
         except FileNotFoundError:
-            self._card_cache = {}
+            return None
+
+    def _ensure_loaded(self) -> None:
+        now = time.monotonic()
+        loaded = self._snapshot is not None or self._card_cache is not None
+        if loaded and self._checked_at is not None and now - self._checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        stamp = self._stamp()
+        if stamp is not None and stamp == self._snapshot_stamp:
+            return
+        if stamp is None and (self._snapshot is not None or self._card_cache is not None):
+            return
+        with self._lock:
+            stamp = self._stamp()
+            if stamp is not None and stamp != self._snapshot_stamp:
+                # A new ingest replaced the snapshot; the old mapping stays open a while for readers still holding it.
+                try:
+                    previous = self._snapshot
+                    self._snapshot = CardSnapshot(self.metadata_path)
+                    self._snapshot_stamp = stamp
+                    self._card_cache = None
+                    if previous is not None:
+                        timer = threading.Timer(SNAPSHOT_CLOSE_DELAY, previous.close)
+                        timer.daemon = True
+                        timer.start()
+                    return
+                except (OSError, ValueError) as exc:
+                    self._snapshot_stamp = stamp
+                    print(f"[melvin] Could not open {self.metadata_path}: {exc}")
+            if self._snapshot is None and self._card_cache is None:
+                try:
+                    self._card_cache = json.loads(self.legacy_metadata_path.read_text(encoding="utf-8"))
+                except FileNotFoundError:
+                    self._card_cache = {}
 
     def get_card(self, name: str) -> Optional[Dict[str, Any]]:
         if not name:
             return None
         self._ensure_loaded()
         key = name.lower()
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.get(key)
         return self._card_cache.get(key) if self._card_cache else None
 
 
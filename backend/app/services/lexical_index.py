@@ -0,0 +1,163 @@
+"""BM25 inverted index persisted next to each corpus' vector store."""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+LEXICAL_INDEX_FILE = "bm25.npz"
+# Rule numbers ("702.22", "702.22a") stay whole; everything else splits on non-word characters.
+_TOKEN_PATTERN = re.compile(r"\d+\.\d+[a-z]?|[^\W_]+", re.UNICODE)
+_RULE_SUBRULE = re.compile(r"^(\d+\.\d+)[a-z]$")
+# Only dropped from queries: they match nearly every chunk and drown out the rare terms.
+QUERY_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in is it its my of on or so "
+    "that the their them then there they this to was what when where which while who why "
+    "will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    tokens: List[str] = []
+    for token in _TOKEN_PATTERN.findall((text or "").lower()):
+        tokens.append(token)
+        subrule = _RULE_SUBRULE.match(token)
+        if subrule:
+            # "702.22a" should also answer a query for "702.22".
+            tokens.append(subrule.group(1))
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks, stored as CSR-style numpy arrays.
+
+    `ids` are the chunk ids used in the matching vector store, so hits are resolved
+    back to documents with `store.get(ids)` instead of keeping a second copy of the
+    text.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        frequencies: np.ndarray,
+        lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.ids = list(ids)
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+        self.frequencies = frequencies
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+        count = len(self.ids)
+        self.average_length = float(lengths.mean()) if count else 0.0
+        document_frequency = np.diff(offsets).astype(np.float64)
+        self.idf = np.log(1.0 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    @classmethod
+    def build(cls, ids: Sequence[str], texts: Iterable[str]) -> "BM25Index":
+        vocabulary: Dict[str, int] = {}
+        term_postings: List[List[Tuple[int, int]]] = []
+        lengths: List[int] = []
+        for position, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                index = vocabulary.get(term)
+                if index is None:
+                    index = vocabulary[term] = len(term_postings)
+                    term_postings.append([])
+                term_postings[index].append((position, frequency))
+        offsets = np.zeros(len(term_postings) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(entries) for entries in term_postings])
+        postings = np.fromiter(
+            (position for entries in term_postings for position, _ in entries), dtype=np.int32, count=int(offsets[-1])
+        )
+        frequencies = np.fromiter(
+            (min(frequency, 65535) for entries in term_postings for _, frequency in entries),
+            dtype=np.uint16,
+            count=int(offsets[-1]),
+        )
+        return cls(ids, vocabulary, offsets, postings, frequencies, np.asarray(lengths, dtype=np.float32))
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Return up to `k` (chunk id, score) pairs, best first; chunks sharing no term are never returned."""
+        if not self.ids or k <= 0:
+            return []
+        terms = {token for token in tokenize(query) if token not in QUERY_STOPWORDS}
+        scores = np.zeros(len(self.ids), dtype=np.float64)
+        matched = False
+        norm = self.k1 * (1.0 - self.b + self.b * self.lengths / max(self.average_length, 1e-9))
+        for term in terms:
+            index = self.vocabulary.get(term)
+            if index is None:
+                continue
+            start, end = self.offsets[index], self.offsets[index + 1]
+            documents = self.postings[start:end]
+            frequency = self.frequencies[start:end].astype(np.float64)
+            scores[documents] += self.idf[index] * frequency * (self.k1 + 1.0) / (frequency + norm[documents])
+            matched = True
+        if not matched:
+            return []
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[position], float(scores[position])) for position in ranked]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = [""] * len(self.vocabulary)
+        for term, index in self.vocabulary.items():
+            terms[index] = term
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez_compressed(
+                handle,
+                ids=np.asarray(self.ids, dtype=np.bytes_),
+                terms=np.frombuffer(json.dumps(terms).encode("utf-8"), dtype=np.uint8),
+                offsets=self.offsets,
+                postings=self.postings,
+                frequencies=self.frequencies,
+                lengths=self.lengths,
+            )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BM25Index"]:
+        """Load a saved index, or None when it is missing or unreadable."""
+        try:
+            with np.load(path) as data:
+                terms = json.loads(data["terms"].tobytes().decode("utf-8"))
+                return cls(
+                    ids=[value.decode("ascii") for value in data["ids"]],
+                    vocabulary={term: index for index, term in enumerate(terms)},
+                    offsets=data["offsets"],
+                    postings=data["postings"],
+                    frequencies=data["frequencies"],
+                    lengths=data["lengths"],
+                )
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> Dict[str, float]:
+    """Sum of 1 / (k + rank) over every ranking a key appears in (ranks start at 1)."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return fused
@@ -1,48 +1,130 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional, List, Tuple, Dict
-import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, List, Tuple, Dict
 import re
+import time
 
 import threading
-
-os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
-os.environ.setdefault("CHROMA_TELEMETRY_ENABLED", "False")
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from .data_loader import datastore, CardEntry
 from ..core.config import get_settings
 from langchain_community.llms import Ollama
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
+from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from ..services.scryfall import scryfall_service
 from ..services.state_manager import state_manager_cls
+from .answer_cache import get_answer_cache
+from .card_detector import card_name_detector
 from .cards import card_search_service
+from .context_budget import ContextBudgeter
+from .embeddings import QueryEmbeddingCache, embedding_provider
 from .knowledge import knowledge_store
+from .lexical_index import LEXICAL_INDEX_FILE, BM25Index, reciprocal_rank_fusion
 from .mana_analyzer import explain_mana_check
+from .metrics import stage_latency
+from .reranker import get_reranker
+from .rule_index import rule_index
 from .sequencer import analyze_sequences
+from .vector_generations import vector_generations
+from .vector_store import VectorStore, document_oracle_ids, open_vector_store
 
 if TYPE_CHECKING:
     from ..models.user import User
 
+# Rank offset in reciprocal rank fusion; 60 is the customary value from the RRF paper.
+RRF_K = 60
+
+
+@dataclass
+class AnswerPipeline:
+    """Per-request state threaded through the answer pipeline stages."""
+
+    question: str
+    user: Optional[User] = None
+    tone: Optional[str] = None
+    detail_level: Optional[str] = None
+    explicit_cards: List[str] = field(default_factory=list)
+    game_state_id: Optional[int] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
+    thinking: List[Dict[str, str]] = field(default_factory=list)
+    citations: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    style_notes: List[str] = field(default_factory=list)
+    commander_colors: List[str] = field(default_factory=list)
+    resolved_cards: Dict[str, CardEntry] = field(default_factory=dict)
+    external_card_sections: List[str] = field(default_factory=list)
+    knowledge_sections: List[str] = field(default_factory=list)
+    tools_context_parts: List[str] = field(default_factory=list)
+    scryfall_cards_context: Optional[str] = None
+    scryfall_card_name: Optional[str] = None
+    state_context: Optional[dict] = None
+    cited_rules: List[Document] = field(default_factory=list)
+    retrieved: Dict[str, List] = field(default_factory=dict)
+    prompt_input: Dict[str, Any] = field(default_factory=dict)
+    prompt_text: str = ""
+    model: Optional[str] = None
+    context_snapshot: Dict[str, Any] = field(default_factory=dict)
+    fallback_text: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
 
 class MelvinService:
     def __init__(self) -> None:
         self._ensure_loaded()
         settings = get_settings()
-        self.vectorstore_path = settings.processed_data_dir / "chroma_db"
-        self.embedding_function = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-        
-        self.rules_db = Chroma(persist_directory=str(self.vectorstore_path / "rules"), embedding_function=self.embedding_function)
-        self.cards_db = Chroma(persist_directory=str(self.vectorstore_path / "cards"), embedding_function=self.embedding_function)
-        self.rulings_db = Chroma(persist_directory=str(self.vectorstore_path / "rulings"), embedding_function=self.embedding_function)
-        self.reference_db = self._load_vector_store("reference")
-        self.retrieval_k = 6
+        self.embedding_function = embedding_provider
+        self.query_embeddings = QueryEmbeddingCache(
+            self.embedding_function, max_entries=settings.query_embedding_cache_size
+        )
+
+        self._store_lock = threading.Lock()
+        self._store_stamp: Optional[int] = None
+        self.vector_generation: Optional[str] = None
+        # (vector store per corpus, BM25 index per corpus), always replaced as a pair.
+        self._store_set: Tuple[Dict[str, Optional[VectorStore]], Dict[str, Optional[BM25Index]]] = ({}, {})
+        # Retrievals still reading each store set (keyed by id); a replaced set is closed
+        # once its count drops to zero, so swaps do not leak Chroma clients.
+        self._store_users: Dict[int, int] = {}
+        self._retired_store_sets: Dict[int, Tuple[Dict[str, Optional[VectorStore]], Dict[str, Optional[BM25Index]]]] = {}
+        self._store_users_lock = threading.Lock()
+        self._open_vector_stores()
+        self.retrieval_k = settings.retrieval_k
+        self.card_rulings_limit = settings.card_rulings_limit
+        self.semantic_rulings_min = max(settings.semantic_rulings_min, 0)
+        self.rulings_by_oracle_id: Dict[str, List] = {}
+        for ruling in sorted(datastore.rulings, key=lambda item: item.published_at or "", reverse=True):
+            if ruling.oracle_id:
+                self.rulings_by_oracle_id.setdefault(ruling.oracle_id, []).append(ruling)
+        # Depth each ranker (vector, BM25) contributes before reciprocal rank fusion.
+        self.retrieval_candidates = max(settings.retrieval_candidates, self.retrieval_k)
+        self.hybrid_retrieval = settings.hybrid_retrieval_enabled
+        # With a reranker, each corpus returns `reranker_candidates` and only the best
+        # `reranker_top_n` across all corpora survive.
+        self.reranker = get_reranker() if settings.reranker_enabled else None
+        self.reranker_candidates = max(settings.reranker_candidates, self.retrieval_k)
+        self.reranker_top_n = max(1, settings.reranker_top_n)
+        self.reranker_budget = settings.reranker_budget_ms / 1000
+        # Scoring is CPU-bound and a running batch cannot be interrupted, so it gets its own
+        # worker: one request at a time, and others skip reranking while it is busy.
+        self._rerank_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="melvin-rerank")
+        self._rerank_busy = threading.Lock()
         self.retrieval_threshold = 0.25
-        self.rule_identifiers = {rule.identifier for rule in datastore.rules}
+        self.retrieval_timeout = settings.retrieval_timeout_seconds
+        # Every concurrent answer fans out to all four corpora at once.
+        self._retrieval_pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.retrieval_max_workers, settings.answer_workers * 4),
+            thread_name_prefix="melvin-retrieval",
+        )
+        self.answer_cache = get_answer_cache() if settings.answer_cache_enabled else None
 
         self.model_name = self._load_model_choice(default_model=settings.ollama_model)
-        self.llm = Ollama(model=self.model_name, base_url=self._ollama_base_url(settings))
+        self.llm = Ollama(
+            model=self.model_name,
+            base_url=self._ollama_base_url(settings),
+            keep_alive=settings.ollama_keep_alive,
+        )
         self._llm_cache: dict[str, Ollama] = {self.model_name: self.llm}
         self.prompt = ChatPromptTemplate.from_template(
             """Answer the question based only on the following context:
@@ -60,11 +142,111 @@ Question: {question}
         if not datastore.rules or not datastore.cards or not datastore.rulings:
             datastore.load()
 
-    def _load_vector_store(self, name: str) -> Optional[Chroma]:
+    def _load_vector_store(self, name: str) -> Optional[VectorStore]:
         target = self.vectorstore_path / name
         if not target.exists():
             return None
-        return Chroma(persist_directory=str(target), embedding_function=self.embedding_function)
+        return open_vector_store(target, self.vector_store_backend, self.embedding_function)
+
+    def _open_vector_stores(self) -> None:
+        """Open every corpus from the current generation and swap them in as one set."""
+        stamp = vector_generations.pointer_stamp()
+        generation, root = vector_generations.current()
+        self.vectorstore_path = root
+        # Whatever backend built this generation, regardless of the current setting.
+        self.vector_store_backend = vector_generations.store_backend(root)
+        stores = {
+            "rules": open_vector_store(root / "rules", self.vector_store_backend, self.embedding_function),
+            "cards": open_vector_store(root / "cards", self.vector_store_backend, self.embedding_function),
+            "rulings": open_vector_store(root / "rulings", self.vector_store_backend, self.embedding_function),
+            "reference": self._load_vector_store("reference"),
+        }
+        lexical = {name: BM25Index.load(root / name / LEXICAL_INDEX_FILE) for name in stores}
+        previous = self._store_set
+        self._store_set = (stores, lexical)
+        self.vector_generation = generation
+        self._store_stamp = stamp
+        self._retire_store_set(previous)
+
+    def _acquire_store_set(self) -> Tuple[Dict[str, Optional[VectorStore]], Dict[str, Optional[BM25Index]]]:
+        """The current store set, held open until a matching `_release_store_set`."""
+        with self._store_users_lock:
+            store_set = self._store_set
+            self._store_users[id(store_set)] = self._store_users.get(id(store_set), 0) + 1
+        return store_set
+
+    def _hold_store_set(self, store_set) -> None:
+        with self._store_users_lock:
+            self._store_users[id(store_set)] = self._store_users.get(id(store_set), 0) + 1
+
+    def _release_store_set(self, store_set) -> None:
+        with self._store_users_lock:
+            key = id(store_set)
+            remaining = self._store_users.get(key, 0) - 1
+            if remaining > 0:
+                self._store_users[key] = remaining
+                return
+            self._store_users.pop(key, None)
+            retired = self._retired_store_sets.pop(key, None)
+        if retired is not None:
+            self._close_store_set(retired)
+
+    def _retire_store_set(self, store_set) -> None:
+        """Close a replaced store set now, or after the last retrieval still reading it."""
+        if not store_set[0]:
+            return
+        with self._store_users_lock:
+            if self._store_users.get(id(store_set)):
+                self._retired_store_sets[id(store_set)] = store_set
+                return
+        self._close_store_set(store_set)
+
+    @staticmethod
+    def _close_store_set(store_set) -> None:
+        for store in store_set[0].values():
+            if store is None:
+                continue
+            try:
+                store.close()
+            except Exception as exc:
+                print(f"[melvin] Could not close retired vector store: {exc}")
+
+    def refresh_vector_stores(self) -> bool:
+        """Hot-swap to a newer vector store generation if ingest has published one."""
+        if vector_generations.pointer_stamp() == self._store_stamp:
+            return False
+        with self._store_lock:
+            stamp = vector_generations.pointer_stamp()
+            if stamp == self._store_stamp:
+                return False
+            generation, _ = vector_generations.current()
+            if generation == self.vector_generation:
+                # Pointer rewritten (e.g. retired list pruned) without a new generation.
+                self._store_stamp = stamp
+                return False
+            try:
+                self._open_vector_stores()
+            except Exception as exc:
+                print(f"[melvin] Failed to open vector store generation {generation}: {exc}")
+                return False
+        print(f"[melvin] Switched to vector store generation {self.vector_generation}")
+        return True
+
+    @property
+    def rules_db(self) -> VectorStore:
+        return self._store_set[0]["rules"]
+
+    @property
+    def cards_db(self) -> VectorStore:
+        return self._store_set[0]["cards"]
+
+    @property
+    def rulings_db(self) -> VectorStore:
+        return self._store_set[0]["rulings"]
+
+    @property
+    def reference_db(self) -> Optional[VectorStore]:
+        return self._store_set[0].get("reference")
 
     def _build_player_guidance(self, user: Optional[User] = None) -> str:
         """
@@ -140,7 +322,9 @@ Question: {question}
     def set_model(self, model_name: str) -> None:
         settings = get_settings()
         self.model_name = model_name
-        self.llm = Ollama(model=model_name, base_url=self._ollama_base_url(settings))
+        self.llm = Ollama(
+            model=model_name, base_url=self._ollama_base_url(settings), keep_alive=settings.ollama_keep_alive
+        )
         self._llm_cache[model_name] = self.llm
         self._save_model_choice(model_name)
 
@@ -154,7 +338,7 @@ Question: {question}
         if cached is not None:
             return cached
         settings = get_settings()
-        llm = Ollama(model=model_name, base_url=self._ollama_base_url(settings))
+        llm = Ollama(model=model_name, base_url=self._ollama_base_url(settings), keep_alive=settings.ollama_keep_alive)
         self._llm_cache[model_name] = llm
         return llm
 
@@ -167,12 +351,75 @@ Question: {question}
                 results.append(candidate)
         return results
 
+    def _cited_rule_documents(self, rule_ids: List[str], max_children: int = 12) -> List[Document]:
+        """Exact text of each cited rule and its lettered subrules, straight from the rule index."""
+        documents: List[Document] = []
+        seen: set[str] = set()
+        for rule_id in rule_ids:
+            entry = rule_index.lookup(rule_id)
+            if entry is None:
+                continue
+            rules = [entry] + entry["children"][:max_children]
+            for rule in rules:
+                if rule["rule_id"] in seen:
+                    continue
+                seen.add(rule["rule_id"])
+                documents.append(
+                    Document(
+                        page_content=f"{rule['rule_id']}: {rule['text']}",
+                        # `cited` marks the rule named in the question, as opposed to its subrules.
+                        metadata={"rule_id": rule["rule_id"], "source": "rule_index", "cited": rule is entry},
+                    )
+                )
+        return documents
+
     def _extract_rule_ids(self, text: str) -> List[str]:
         if not text:
             return []
         pattern = re.compile(r"\b(\d{3}\.\d+[a-z]?)\b")
         return pattern.findall(text)
 
+    def _new_pipeline(
+        self,
+        question: str,
+        user: Optional[User] = None,
+        tone: Optional[str] = None,
+        detail_level: Optional[str] = None,
+        selected_cards: Optional[List[str]] = None,
+        game_state_id: Optional[int] = None,
+    ) -> AnswerPipeline:
+        return AnswerPipeline(
+            question=question,
+            user=user,
+            tone=tone,
+            detail_level=detail_level,
+            explicit_cards=selected_cards or [],
+            game_state_id=game_state_id,
+            payload={"question": question},
+        )
+
+    def _pipeline_stages(self) -> List[Tuple[str, Callable[[AnswerPipeline], None]]]:
+        return [
+            ("preferences", self._stage_preferences),
+            ("state", self._stage_state),
+            ("cards", self._stage_cards),
+            ("autocomplete", self._stage_autocomplete),
+            ("knowledge", self._stage_knowledge),
+            ("analysis", self._stage_analysis),
+            ("retrieval", self._stage_retrieval),
+            ("budget", self._stage_budget),
+            ("prompt", self._stage_prompt),
+        ]
+
+    def _run_pipeline(self, pipeline: AnswerPipeline) -> Iterator[List[Dict[str, str]]]:
+        """Run each stage in order, yielding the thinking steps it added."""
+        for name, stage in self._pipeline_stages():
+            start = len(pipeline.thinking)
+            started = time.monotonic()
+            stage(pipeline)
+            pipeline.timings[name] = time.monotonic() - started
+            yield pipeline.thinking[start:]
+
     def answer_question_with_details(
         self,
         question: str,
@@ -180,31 +427,184 @@ Question: {question}
         tone: Optional[str] = None,
         detail_level: Optional[str] = None,
         selected_cards: Optional[List[str]] = None,
+        game_state_id: Optional[int] = None,
     ) -> Tuple[str, List[Dict[str, str]], Dict[str, str]]:
-        explicit_cards = selected_cards or []
-        thinking: List[Dict[str, str]] = []
-        citations: List[str] = []
-        thinking.append({"label": "Question received", "detail": question.strip()})
-        style_notes: List[str] = []
-        if tone:
-            style_notes.append(f"Preferred tone: {tone}")
-        if detail_level:
-            style_notes.append(f"Detail level: {detail_level}")
-        if style_notes:
-            thinking.append({"label": "User preference", "detail": " | ".join(style_notes)})
-
-        # Try to detect a card name via Scryfall autocomplete on the whole question.
-        # If we get a suggestion, fetch the named card and include a short summary
-        # in the `cards_context` to help the model.
-        scryfall_cards_context = None
-        scryfall_card_name = None
-        state_context = None
-        external_card_sections: List[str] = []
+        pipeline = self._new_pipeline(question, user, tone, detail_level, selected_cards, game_state_id)
+        for _ in self._run_pipeline(pipeline):
+            pass
+        if pipeline.fallback_text is not None:
+            self._record_latency(pipeline, pipeline.thinking, pipeline.context_snapshot)
+            return pipeline.fallback_text, pipeline.thinking, pipeline.context_snapshot
+        cached = self._cached_answer(pipeline)
+        if cached is not None:
+            answer_text, thinking, context = cached
+            self._record_latency(pipeline, thinking, context)
+            return answer_text, thinking, context
+
+        llm = self._get_llm_instance(pipeline.model)
+        started = time.monotonic()
+        llm_response = llm.invoke(pipeline.prompt_text)
+        pipeline.timings["llm"] = time.monotonic() - started
+        answer_text = llm_response if isinstance(llm_response, str) else StrOutputParser().invoke(llm_response)
+        answer_text = self._finish_answer(pipeline, answer_text)
+        self._remember_answer(pipeline, answer_text)
+        self._record_latency(pipeline, pipeline.thinking, pipeline.context_snapshot)
+        return answer_text, pipeline.thinking, pipeline.context_snapshot
+
+    def stream_answer(
+        self,
+        question: str,
+        user: Optional[User] = None,
+        tone: Optional[str] = None,
+        detail_level: Optional[str] = None,
+        selected_cards: Optional[List[str]] = None,
+        game_state_id: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of `answer_question_with_details`.
+
+        Yields `thinking` events as each pipeline stage finishes, then `token` events
+        as Ollama generates text, and finally a single `done` event carrying the full
+        answer (with postamble), thinking trace and context snapshot.
+        """
+        pipeline = self._new_pipeline(question, user, tone, detail_level, selected_cards, game_state_id)
+        for steps in self._run_pipeline(pipeline):
+            for step in steps:
+                yield {"event": "thinking", "data": step}
+
+        cached = None if pipeline.fallback_text is not None else self._cached_answer(pipeline)
+        if pipeline.fallback_text is not None:
+            answer_text = pipeline.fallback_text
+            self._record_latency(pipeline, pipeline.thinking, pipeline.context_snapshot)
+            yield {"event": "thinking", "data": pipeline.thinking[-1]}
+        elif cached is not None:
+            answer_text, cached_thinking, cached_context = cached
+            # The trace is what this request streamed plus the cache step, not the cached request's stages.
+            pipeline.thinking.append(cached_thinking[-1])
+            self._record_latency(pipeline, pipeline.thinking, cached_context)
+            yield {"event": "thinking", "data": pipeline.thinking[-2]}
+            yield {"event": "thinking", "data": pipeline.thinking[-1]}
+            yield {
+                "event": "done",
+                "data": {"answer": answer_text, "thinking": pipeline.thinking, "context": cached_context},
+            }
+            return
+        else:
+            llm = self._get_llm_instance(pipeline.model)
+            chunks: List[str] = []
+            started = time.monotonic()
+            for chunk in llm.stream(pipeline.prompt_text):
+                text = chunk if isinstance(chunk, str) else str(chunk)
+                if not text:
+                    continue
+                if not chunks:
+                    pipeline.timings["llm_first_token"] = time.monotonic() - started
+                chunks.append(text)
+                yield {"event": "token", "data": text}
+            pipeline.timings["llm"] = time.monotonic() - started
+            answer_text = self._finish_answer(pipeline, "".join(chunks))
+            self._remember_answer(pipeline, answer_text)
+            self._record_latency(pipeline, pipeline.thinking, pipeline.context_snapshot)
+            yield {"event": "thinking", "data": pipeline.thinking[-2]}
+            yield {"event": "thinking", "data": pipeline.thinking[-1]}
+
+        yield {
+            "event": "done",
+            "data": {
+                "answer": answer_text,
+                "thinking": pipeline.thinking,
+                "context": pipeline.context_snapshot,
+            },
+        }
+
+    def _cached_answer(
+        self, pipeline: AnswerPipeline
+    ) -> Optional[Tuple[str, List[Dict[str, str]], Dict[str, Any]]]:
+        """Return a semantically matching cached answer for this prompt context, if any."""
+        if not self.answer_cache:
+            return None
         try:
-            ac = scryfall_service.autocomplete(question)
+            embedding, _ = self.query_embeddings.embed(pipeline.question)
+            hit = self.answer_cache.lookup(embedding, pipeline.model, pipeline.prompt_input)
+        except Exception:
+            return None
+        if not hit:
+            return None
+        thinking = list(hit["thinking"]) + [
+            {
+                "label": "Answer cache",
+                "detail": f"Served cached answer for a similar question (similarity {hit['similarity']:.2f}); skipped {pipeline.model}.",
+            }
+        ]
+        context = {**hit["context"], "cached": True}
+        return hit["answer"], thinking, context
+
+    def _remember_answer(self, pipeline: AnswerPipeline, answer_text: str) -> None:
+        if not self.answer_cache:
+            return
+        try:
+            embedding, _ = self.query_embeddings.embed(pipeline.question)
+            self.answer_cache.store(
+                pipeline.question,
+                embedding,
+                pipeline.model,
+                pipeline.prompt_input,
+                answer_text,
+                pipeline.thinking,
+                pipeline.context_snapshot,
+            )
+        except Exception:
+            # Caching is best-effort; a failed write must not break the answer.
+            pass
+
+    def _record_latency(
+        self, pipeline: AnswerPipeline, thinking: List[Dict[str, str]], context: Dict[str, Any]
+    ) -> None:
+        """Add the per-stage timings to the trace and snapshot, and feed the rolling stats."""
+        timings_ms = {stage: round(seconds * 1000, 1) for stage, seconds in pipeline.timings.items()}
+        detail = ", ".join(f"{stage} {value:.0f} ms" for stage, value in timings_ms.items())
+        thinking.append({"label": "Latency breakdown", "detail": detail})
+        context["timings_ms"] = timings_ms
+        stage_latency.record(timings_ms)
+
+    def _finish_answer(self, pipeline: AnswerPipeline, answer_text: str) -> str:
+        answer_text = self._apply_postamble(answer_text, pipeline.citations, pipeline.warnings)
+        pipeline.thinking.append(
+            {"label": "Final synthesis", "detail": f"Generated response with {pipeline.model} via Ollama."}
+        )
+        return answer_text
+
+    def _stage_preferences(self, pipeline: AnswerPipeline) -> None:
+        thinking = pipeline.thinking
+        thinking.append({"label": "Question received", "detail": pipeline.question.strip()})
+        if pipeline.tone:
+            pipeline.style_notes.append(f"Preferred tone: {pipeline.tone}")
+        if pipeline.detail_level:
+            pipeline.style_notes.append(f"Detail level: {pipeline.detail_level}")
+        if pipeline.style_notes:
+            thinking.append({"label": "User preference", "detail": " | ".join(pipeline.style_notes)})
+
+    def _stage_autocomplete(self, pipeline: AnswerPipeline) -> None:
+        # Fall back to Scryfall autocomplete on the whole question when no card was found
+        # locally, or on the first capitalized span the local matches left uncovered (a
+        # misspelled or newer name next to a known one). If we get a suggestion, fetch the
+        # named card and include a short summary in the `cards_context` to help the model.
+        query = pipeline.question
+        if pipeline.resolved_cards:
+            known = " ".join(pipeline.resolved_cards)
+            spans = [
+                span for span in card_name_detector.uncovered_capitalized_spans(pipeline.question) if span not in known
+            ]
+            if not spans:
+                return
+            query = spans[0]
+        try:
+            ac = scryfall_service.autocomplete(query)
             if ac and ac.get("data"):
                 # take top suggestion
                 top = ac["data"][0]
+                if top.lower() in pipeline.resolved_cards:
+                    return
                 # fetch full card by named fuzzy
                 card = scryfall_service.get_card(f"named?fuzzy={top}")
                 # Build a short summary
@@ -215,39 +615,50 @@ Question: {question}
                     parts.append(f"Type: {card.get('type_line')}")
                 if card.get("oracle_text"):
                     parts.append(f"Oracle: {card.get('oracle_text')}")
-                scryfall_cards_context = "\n".join(parts)
-                scryfall_card_name = card.get("name")
+                pipeline.scryfall_cards_context = "\n".join(parts)
+                pipeline.scryfall_card_name = card.get("name")
         except Exception:
             # on any failure, continue without external card context
-            scryfall_cards_context = None
+            pipeline.scryfall_cards_context = None
 
-        # Try to attach the most recent saved board state as `state_context` if available
-        try:
-            # attempt to get latest state from DB if available
-            # lightweight: fetch the most recent saved state
-            db = None
-            from ..dependencies import get_db as _get_db
+        scryfall_cards_context = pipeline.scryfall_cards_context
+        if scryfall_cards_context:
+            pipeline.external_card_sections.append(f"Scryfall autocomplete:\n{scryfall_cards_context}")
+            first_line = scryfall_cards_context.splitlines()[0] if scryfall_cards_context.splitlines() else scryfall_cards_context
+            if first_line.lower().startswith("name:"):
+                card_name = first_line.split(":", 1)[1].strip()
+            else:
+                card_name = first_line.strip()
+            pipeline.thinking.append({"label": "Card context", "detail": f"Added Scryfall summary for {card_name}"})
+        if pipeline.scryfall_card_name:
+            pipeline.citations.append(f"Scryfall autocomplete: {pipeline.scryfall_card_name}")
 
-            # dependencies.get_db is a generator; can't call here reliably — skip if not in request
-            # Instead, attempt to read a fallback latest entry via direct session import if available
+    def _stage_state(self, pipeline: AnswerPipeline) -> None:
+        # Attach the board state bound to this conversation, if any, as `state_context`
+        if pipeline.game_state_id is None:
+            return
+        try:
+            # dependencies.get_db is a generator; can't call here reliably — open a direct session instead.
+            # The session only connects on a cache miss.
             from ..core.database import SessionLocal
             with SessionLocal() as session:
                 manager = state_manager_cls(session)
-                states = manager.list_states()
-                if states:
-                    state_context = states[0].state
+                pipeline.state_context = manager.get_state_payload(pipeline.game_state_id)
         except Exception:
-            state_context = None
-
-        payload = {"question": question}
-        resolved_cards: Dict[str, CardEntry] = {}
-        warnings: List[str] = []
-        tools_context_parts: List[str] = []
-        commander_colors = self._parse_commander_identity(question)
-        if commander_colors:
-            tools_context_parts.append("Commander identity => " + ", ".join(commander_colors))
-        if explicit_cards:
-            resolved = card_search_service.resolve_cards(explicit_cards)
+            pipeline.state_context = None
+
+    def _stage_cards(self, pipeline: AnswerPipeline) -> None:
+        question = pipeline.question
+        thinking = pipeline.thinking
+        resolved_cards = pipeline.resolved_cards
+        external_card_sections = pipeline.external_card_sections
+        warnings = pipeline.warnings
+
+        pipeline.commander_colors = self._parse_commander_identity(question)
+        if pipeline.commander_colors:
+            pipeline.tools_context_parts.append("Commander identity => " + ", ".join(pipeline.commander_colors))
+        if pipeline.explicit_cards:
+            resolved = card_search_service.resolve_cards(pipeline.explicit_cards)
             if resolved:
                 for entry in resolved:
                     if entry.name:
@@ -277,34 +688,44 @@ Question: {question}
                     "The following tagged cards were not found in the local Oracle database: "
                     + ", ".join(sorted(unmatched))
                 )
-        mentioned_rules = set(self._extract_rule_ids(question))
-        missing_rules = sorted(mentioned_rules - self.rule_identifiers)
+        mentioned_rules = list(dict.fromkeys(self._extract_rule_ids(question)))
+        missing_rules = sorted(rule_id for rule_id in mentioned_rules if rule_id not in rule_index)
+        pipeline.cited_rules = self._cited_rule_documents(mentioned_rules)
+        if pipeline.cited_rules:
+            injected = ", ".join(doc.metadata["rule_id"] for doc in pipeline.cited_rules)
+            thinking.append({"label": "Rule lookup", "detail": f"Injected cited rules by number: {injected}"})
         if missing_rules:
             warnings.append(
                 "These referenced rule IDs were not found in the loaded Comprehensive Rules snapshot: "
                 + ", ".join(missing_rules)
             )
 
-        resolved_list = list(resolved_cards.values())
-        knowledge_sections: List[str] = []
-        knowledge_names: List[str] = []
-        if scryfall_cards_context:
-            external_card_sections.append(f"Scryfall autocomplete:\n{scryfall_cards_context}")
-            first_line = scryfall_cards_context.splitlines()[0] if scryfall_cards_context.splitlines() else scryfall_cards_context
-            if first_line.lower().startswith("name:"):
-                card_name = first_line.split(":", 1)[1].strip()
-            else:
-                card_name = first_line.strip()
-            thinking.append({"label": "Card context", "detail": f"Added Scryfall summary for {card_name}"})
-        if scryfall_card_name:
-            citations.append(f"Scryfall autocomplete: {scryfall_card_name}")
+        detected_entries = [
+            entry
+            for entry in card_name_detector.detect(question)
+            if entry.name and entry.name.lower() not in resolved_cards
+        ]
+        if detected_entries:
+            for entry in detected_entries:
+                resolved_cards.setdefault(entry.name.lower(), entry)
+            detected_sections = [self._format_card_entry(entry) for entry in detected_entries]
+            external_card_sections.append("Detected cards:\n" + "\n\n".join(detected_sections))
+            names = ", ".join(entry.name for entry in detected_entries)
+            thinking.append({"label": "Card context", "detail": f"Detected card names in question: {names}"})
 
-        if resolved_list:
-            names = ", ".join(entry.name for entry in resolved_list if entry.name)
+        if resolved_cards:
+            names = ", ".join(entry.name for entry in resolved_cards.values() if entry.name)
             if names:
-                citations.append(f"Oracle database entries: {names}")
+                pipeline.citations.append(f"Oracle database entries: {names}")
 
-        for entry in resolved_list:
+    def _stage_knowledge(self, pipeline: AnswerPipeline) -> None:
+        tools_context_parts = pipeline.tools_context_parts
+        commander_colors = pipeline.commander_colors
+        warnings = pipeline.warnings
+        knowledge_sections = pipeline.knowledge_sections
+        knowledge_names: List[str] = []
+
+        for entry in pipeline.resolved_cards.values():
             meta = knowledge_store.get_card(entry.name or "")
             if not meta:
                 continue
@@ -350,15 +771,22 @@ Question: {question}
                     warning = f"{card_name} references your commander's color identity. Please specify your commander's colors."
                     if warning not in warnings:
                         warnings.append(warning)
-        card_names_for_tools = [entry.name for entry in resolved_list if entry.name]
 
         if knowledge_sections:
-            payload["knowledge_context"] = "\n\n".join(knowledge_sections)
-            thinking.append({"label": "Knowledge graph", "detail": "Injected structured metadata for tagged/user-selected cards."})
+            pipeline.payload["knowledge_context"] = "\n\n".join(knowledge_sections)
+            pipeline.thinking.append({"label": "Knowledge graph", "detail": "Injected structured metadata for tagged/user-selected cards."})
         else:
-            payload["knowledge_context"] = ""
+            pipeline.payload["knowledge_context"] = ""
         if knowledge_names:
-            citations.append("Knowledge graph data: " + ", ".join(knowledge_names))
+            pipeline.citations.append("Knowledge graph data: " + ", ".join(knowledge_names))
+
+    def _stage_analysis(self, pipeline: AnswerPipeline) -> None:
+        question = pipeline.question
+        thinking = pipeline.thinking
+        payload = pipeline.payload
+        tools_context_parts = pipeline.tools_context_parts
+        resolved_list = list(pipeline.resolved_cards.values())
+        card_names_for_tools = [entry.name for entry in resolved_list if entry.name]
 
         mana_report = explain_mana_check(question, card_names_for_tools)
         if mana_report:
@@ -370,9 +798,11 @@ Question: {question}
             tools_context_parts.append(sequence_report)
             thinking.append({"label": "Sequencer", "detail": sequence_report})
 
-        if external_card_sections:
-            payload["external_cards_context"] = "\n\n".join(external_card_sections)
+        if pipeline.external_card_sections:
+            payload["external_cards_context"] = "\n\n".join(pipeline.external_card_sections)
         rule_engine_used = False
+        state_context = pipeline.state_context
+        scryfall_cards_context = pipeline.scryfall_cards_context
         if state_context:
             payload["state_context"] = state_context
             # Derive deterministic rule outputs for top suspected card and include as tools_context
@@ -410,23 +840,171 @@ Question: {question}
             thinking.append({"label": "Rule engine", "detail": "Added deterministic rule engine checks to context"})
         if tools_context_parts:
             payload["tools_context"] = "\n".join(tools_context_parts)
-        
+
         # Add player guidance based on profile
-        player_guidance = self._build_player_guidance(user)
-        if style_notes:
-            preference_line = " ".join(style_notes)
+        player_guidance = self._build_player_guidance(pipeline.user)
+        if pipeline.style_notes:
+            preference_line = " ".join(pipeline.style_notes)
             player_guidance = f"{player_guidance}\nConversation preferences: {preference_line}".strip()
         payload["player_guidance"] = player_guidance
         if player_guidance:
             thinking.append({"label": "Player profile", "detail": player_guidance})
 
-        rules_docs = self._retrieve_documents(self.rules_db, question)
-        cards_docs = self._retrieve_documents(self.cards_db, question)
-        rulings_docs = self._retrieve_documents(self.rulings_db, question)
-        reference_docs: List = []
-        if self.reference_db:
-            reference_docs = self._retrieve_documents(self.reference_db, question, include_scores=False)
+    def _stage_retrieval(self, pipeline: AnswerPipeline) -> None:
+        card_rulings = self._card_rulings(pipeline.resolved_cards.values())
+        oracle_ids = sorted({doc.metadata["oracle_id"] for doc in card_rulings})
+        # Resolved cards' rulings come from the index; semantic search fills what is left,
+        # keeping at least `semantic_rulings_min` slots for rulings on other cards.
+        limits = (
+            {"rulings": max(self.retrieval_k - len(card_rulings), self.semantic_rulings_min)} if card_rulings else {}
+        )
+        depth = limits
+        if self.reranker is not None:
+            depth = {
+                name: self.reranker_candidates if limits.get(name, self.retrieval_k) > 0 else 0
+                for name in ("rules", "cards", "rulings", "reference")
+            }
+        retrieved, timings, latencies = self._retrieve_all(
+            pipeline.question, limits=depth, exclude_oracle_ids={"rulings": oracle_ids} if oracle_ids else None
+        )
+        for name, seconds in latencies.items():
+            pipeline.timings[f"retrieval.{name}"] = seconds
+        if timings:
+            pipeline.thinking.append({"label": "Retrieval timing", "detail": ", ".join(timings)})
+        if self.reranker is not None:
+            retrieved = self._rerank(pipeline, retrieved, limits)
+        if card_rulings:
+            names = sorted({doc.metadata["card_name"] for doc in card_rulings})
+            pipeline.thinking.append(
+                {
+                    "label": "Card rulings",
+                    "detail": f"{len(card_rulings)} rulings for {', '.join(names)} from the oracle_id index; "
+                    f"{len(retrieved['rulings'])} more from semantic search",
+                }
+            )
+            retrieved["rulings"] = card_rulings + retrieved["rulings"]
+        pipeline.retrieved = retrieved
 
+    def _run_rerank(self, question: str, passages: List[str], deadline: float) -> Optional[List[float]]:
+        try:
+            return self.reranker.rerank(question, passages, deadline)
+        finally:
+            self._rerank_busy.release()
+
+    def _rerank(self, pipeline: AnswerPipeline, retrieved: Dict[str, List], limits: Dict[str, int]) -> Dict[str, List]:
+        """
+        Rescore every retrieved candidate with the cross-encoder and keep the best
+        `reranker_top_n` across corpora. If the model is still loading, fails, is busy
+        with another request, or does not finish within `reranker_budget`, each corpus
+        keeps its first `retrieval_k` candidates in retrieval order, exactly as without
+        a reranker.
+        """
+        candidates = [(name, doc) for name, docs in retrieved.items() for doc in docs]
+        if not candidates:
+            return retrieved
+        started = time.monotonic()
+        busy = not self._rerank_busy.acquire(blocking=False)
+        scores = None
+        if not busy:
+            try:
+                future = self._rerank_pool.submit(
+                    self._run_rerank,
+                    pipeline.question,
+                    [doc.page_content for _, doc in candidates],
+                    started + self.reranker_budget,
+                )
+            except Exception:
+                # Nothing will run `_run_rerank`, so its release has to happen here (e.g. executor shut down).
+                self._rerank_busy.release()
+                future = None
+            try:
+                scores = future.result(timeout=self.reranker_budget) if future is not None else None
+            except FutureTimeoutError:
+                # The batch in flight finishes on the rerank worker, sees the deadline and frees it.
+                scores = None
+            except Exception:
+                scores = None
+        elapsed = time.monotonic() - started
+        pipeline.timings["retrieval.rerank"] = elapsed
+
+        if scores is None:
+            if busy:
+                reason = "reranker busy with another request"
+            elif self.reranker.ready:
+                reason = f"over the {self.reranker_budget * 1000:.0f} ms budget"
+            else:
+                reason = "model unavailable" if self.reranker.failed else "model loading"
+            pipeline.thinking.append({"label": "Reranking", "detail": f"Skipped ({reason}); kept retrieval order"})
+            return {name: docs[: limits.get(name, self.retrieval_k)] for name, docs in retrieved.items()}
+
+        order = sorted(range(len(candidates)), key=lambda index: scores[index], reverse=True)
+        kept: Dict[str, List] = {name: [] for name in retrieved}
+        for index in order[: self.reranker_top_n]:
+            name, doc = candidates[index]
+            doc.metadata = {**(doc.metadata or {}), "relevance_score": scores[index], "rerank_score": scores[index]}
+            kept[name].append(doc)
+        pipeline.thinking.append(
+            {
+                "label": "Reranking",
+                "detail": f"{len(candidates)} candidates scored in {elapsed * 1000:.0f} ms; kept "
+                + ", ".join(f"{len(docs)} {name}" for name, docs in kept.items()),
+            }
+        )
+        return kept
+
+    def _card_rulings(self, entries) -> List[Document]:
+        """Newest rulings of each resolved card, looked up by oracle_id with no vector search."""
+        documents: List[Document] = []
+        seen: set[str] = set()
+        for entry in entries:
+            if not entry.oracle_id or entry.oracle_id in seen:
+                continue
+            seen.add(entry.oracle_id)
+            for ruling in self.rulings_by_oracle_id.get(entry.oracle_id, [])[: self.card_rulings_limit]:
+                documents.append(
+                    Document(
+                        page_content=ruling.comment,
+                        metadata={
+                            "oracle_id": entry.oracle_id,
+                            "card_name": entry.name,
+                            "published_at": ruling.published_at,
+                            "source": "card_rulings",
+                            # Exact matches for a card in the question outrank any semantic hit.
+                            "relevance_score": 1.0,
+                        },
+                    )
+                )
+        return documents
+
+    def _stage_budget(self, pipeline: AnswerPipeline) -> None:
+        thinking = pipeline.thinking
+        citations = pipeline.citations
+        payload = pipeline.payload
+
+        cited_rules = pipeline.cited_rules
+        pinned = [
+            pipeline.question,
+            *(doc.page_content for doc in cited_rules),
+            payload.get("external_cards_context") or "",
+            payload.get("knowledge_context") or "",
+            payload.get("player_guidance") or "",
+        ]
+        budgeter = ContextBudgeter(self._prompt_budget_for(self._resolve_model_for_user(pipeline.user)))
+        selected, report = budgeter.select(
+            pipeline.retrieved,
+            pinned,
+            known_card_names=[entry.name for entry in pipeline.resolved_cards.values() if entry.name],
+        )
+        pipeline.retrieved = selected
+        thinking.append({"label": "Context budget", "detail": report.describe()})
+
+        cited_ids = {doc.metadata["rule_id"] for doc in cited_rules}
+        rules_docs = cited_rules + [
+            doc for doc in selected["rules"] if (doc.metadata or {}).get("rule_id") not in cited_ids
+        ]
+        cards_docs = selected["cards"]
+        rulings_docs = selected["rulings"]
+        reference_docs = selected["reference"]
         payload["rules_context"] = rules_docs
         payload["cards_context"] = cards_docs
         payload["rulings_context"] = rulings_docs
@@ -454,7 +1032,10 @@ Question: {question}
         if summary:
             thinking.append(summary)
 
-        rule_doc_ids = self._rule_ids_from_docs(rules_docs)
+        cited_top = [doc.metadata["rule_id"] for doc in cited_rules if doc.metadata.get("cited")]
+        rule_doc_ids = cited_top + [
+            rule_id for rule_id in self._rule_ids_from_docs(rules_docs[len(cited_rules):]) if rule_id not in cited_top
+        ]
         if rule_doc_ids:
             citations.append("Comprehensive Rules: " + ", ".join(rule_doc_ids))
         if cards_docs:
@@ -462,38 +1043,42 @@ Question: {question}
         if rulings_docs:
             citations.append("Historic rulings corpus")
 
+    def _prompt_budget_for(self, model_name: str) -> int:
+        settings = get_settings()
+        return settings.prompt_token_budgets.get(model_name, settings.prompt_token_budget)
+
+    def _stage_prompt(self, pipeline: AnswerPipeline) -> None:
+        payload = pipeline.payload
         has_context = any(
             [
-                rules_docs,
-                cards_docs,
-                rulings_docs,
-                reference_docs,
-                external_card_sections,
-                knowledge_sections,
-                state_context,
+                pipeline.cited_rules,
+                *pipeline.retrieved.values(),
+                pipeline.external_card_sections,
+                pipeline.knowledge_sections,
+                pipeline.state_context,
             ]
         )
 
         if not has_context:
             fallback = "I could not find any supporting card, rule, or ruling data for that request. Please double-check the names or provide more detail."
-            answer_text = self._apply_postamble(fallback, citations, warnings)
-            context_snapshot = {
+            pipeline.fallback_text = self._apply_postamble(fallback, pipeline.citations, pipeline.warnings)
+            pipeline.context_snapshot = {
                 "rules": "",
                 "cards": "",
                 "rulings": "",
                 "references": "",
                 "knowledge": "",
                 "player_guidance": "",
-                "state": state_context or "",
+                "state": pipeline.state_context or "",
                 "tools": payload.get("tools_context") or "",
                 "external_cards": payload.get("external_cards_context") or "",
             }
-            thinking.append({"label": "Insufficient context", "detail": "No relevant documents were retrieved; returned fallback guidance."})
-            return answer_text, thinking, context_snapshot
+            pipeline.thinking.append({"label": "Insufficient context", "detail": "No relevant documents were retrieved; returned fallback guidance."})
+            return
 
         prompt_input = self._prepare_prompt_input(payload)
-        model_for_request = self._resolve_model_for_user(user)
-        context_snapshot = {
+        pipeline.model = self._resolve_model_for_user(pipeline.user)
+        pipeline.context_snapshot = {
             "rules": prompt_input.get("rules_context", ""),
             "cards": prompt_input.get("cards_context", ""),
             "rulings": prompt_input.get("rulings_context", ""),
@@ -503,15 +1088,10 @@ Question: {question}
             "state": payload.get("state_context") or "",
             "tools": payload.get("tools_context") or "",
             "external_cards": payload.get("external_cards_context") or "",
-            "model": model_for_request,
+            "model": pipeline.model,
         }
-        prompt_value = self.prompt.format_prompt(**prompt_input)
-        llm = self._get_llm_instance(model_for_request)
-        llm_response = llm.invoke(prompt_value.to_string())
-        answer_text = llm_response if isinstance(llm_response, str) else StrOutputParser().invoke(llm_response)
-        answer_text = self._apply_postamble(answer_text, citations, warnings)
-        thinking.append({"label": "Final synthesis", "detail": f"Generated response with {model_for_request} via Ollama."})
-        return answer_text, thinking, context_snapshot
+        pipeline.prompt_input = prompt_input
+        pipeline.prompt_text = self.prompt.format_prompt(**prompt_input).to_string()
 
     def _prepare_prompt_input(self, payload: dict) -> dict:
         def format_docs(value):
@@ -540,16 +1120,218 @@ Question: {question}
         merged["player_guidance"] = payload.get("player_guidance", "")
         return merged
 
-    def _retrieve_documents(self, store: Chroma, question: str, include_scores: bool = True) -> List:
+    def _retrieve_all(
+        self,
+        question: str,
+        limits: Optional[Dict[str, int]] = None,
+        exclude_oracle_ids: Optional[Dict[str, List[str]]] = None,
+    ) -> Tuple[Dict[str, List], List[str], Dict[str, float]]:
+        """
+        Search every corpus concurrently on the bounded retrieval pool.
+
+        The question is embedded once (through the query embedding LRU) and the same
+        vector is handed to every store. Each store gets `retrieval_timeout` seconds
+        once its search starts running; time spent waiting for a pool worker is not
+        charged against it but is itself capped at `retrieval_timeout` and reported as
+        the `queue` latency. A store that is slow, stays queued or raises degrades to an
+        empty result so it cannot stall the answer. Returns the documents per corpus, a
+        human-readable latency line per step, and the raw latency in seconds per
+        completed step.
+
+        `limits` lowers `retrieval_k` per corpus (0 skips the corpus) and
+        `exclude_oracle_ids` drops documents tagged with those oracle ids.
+        """
+        limits = limits or {}
+        exclude_oracle_ids = exclude_oracle_ids or {}
+        self.refresh_vector_stores()
+        # One read of the store set, so a swap mid-request cannot mix generations.
+        store_set = self._acquire_store_set()
         try:
-            if include_scores:
-                results = store.similarity_search_with_relevance_scores(question, k=self.retrieval_k)
-                docs = [doc for doc, score in results if score is None or score >= self.retrieval_threshold]
-            else:
-                docs = store.similarity_search(question, k=self.retrieval_k)
-            return docs
+            return self._retrieve_from(store_set, question, limits, exclude_oracle_ids)
+        finally:
+            self._release_store_set(store_set)
+
+    def _retrieve_from(
+        self,
+        store_set: Tuple[Dict[str, Optional[VectorStore]], Dict[str, Optional[BM25Index]]],
+        question: str,
+        limits: Dict[str, int],
+        exclude_oracle_ids: Dict[str, List[str]],
+    ) -> Tuple[Dict[str, List], List[str], Dict[str, float]]:
+        stores, lexical = store_set
+        targets = [
+            ("rules", stores["rules"], True),
+            ("cards", stores["cards"], True),
+            ("rulings", stores["rulings"], True),
+            ("reference", stores.get("reference"), False),
+        ]
+        results: Dict[str, List] = {name: [] for name, _, _ in targets}
+        timings: List[str] = []
+        latencies: Dict[str, float] = {}
+
+        started = time.monotonic()
+        try:
+            embedding, cached = self.query_embeddings.embed(question)
+        except Exception:
+            timings.append("embedding failed")
+            return results, timings, latencies
+        latencies["embedding"] = time.monotonic() - started
+        source = "cached" if cached else "encoded"
+        timings.append(f"embedding {latencies['embedding'] * 1000:.0f} ms ({source})")
+
+        submitted = time.monotonic()
+        running: Dict[str, threading.Event] = {}
+        start_times: Dict[str, float] = {}
+        futures = {}
+        for name, store, include_scores in targets:
+            if store is None or limits.get(name, self.retrieval_k) <= 0:
+                continue
+            running[name] = threading.Event()
+            # A search that outlives its timeout keeps the store set open until it returns.
+            self._hold_store_set(store_set)
+            futures[name] = self._retrieval_pool.submit(
+                self._timed_retrieve,
+                store,
+                embedding,
+                include_scores,
+                question,
+                lexical.get(name) if self.hybrid_retrieval else None,
+                limits.get(name),
+                exclude_oracle_ids.get(name) or [],
+                (running[name], start_times, name),
+            )
+            futures[name].add_done_callback(lambda _, held=store_set: self._release_store_set(held))
+        waits: List[float] = []
+        for name, future in futures.items():
+            if not running[name].wait(timeout=max(0.0, submitted + self.retrieval_timeout - time.monotonic())):
+                if future.cancel() or not running[name].is_set():
+                    timings.append(f"{name} skipped (no free retrieval worker for {self.retrieval_timeout:.1f}s)")
+                    continue
+            waits.append(start_times[name] - submitted)
+            try:
+                docs, elapsed = future.result(
+                    timeout=max(0.0, start_times[name] + self.retrieval_timeout - time.monotonic())
+                )
+            except FutureTimeoutError:
+                timings.append(f"{name} timed out after {self.retrieval_timeout:.1f}s")
+                continue
+            results[name] = docs
+            latencies[name] = elapsed
+            lexical_hits = sum(1 for doc in docs if (doc.metadata or {}).get("retrieval") in ("lexical", "hybrid"))
+            detail = f"{len(docs)} docs, {lexical_hits} lexical" if lexical.get(name) and self.hybrid_retrieval else f"{len(docs)} docs"
+            timings.append(f"{name} {elapsed * 1000:.0f} ms ({detail})")
+        if waits:
+            latencies["queue"] = max(waits)
+            timings.append(f"queue wait {latencies['queue'] * 1000:.0f} ms")
+        return results, timings, latencies
+
+    def _timed_retrieve(
+        self,
+        store: VectorStore,
+        embedding: List[float],
+        include_scores: bool,
+        question: str = "",
+        lexical: Optional[BM25Index] = None,
+        k: Optional[int] = None,
+        exclude_oracle_ids: Optional[List[str]] = None,
+        signal: Optional[Tuple[threading.Event, Dict[str, float], str]] = None,
+    ) -> Tuple[List, float]:
+        started = time.monotonic()
+        if signal is not None:
+            # Tells `_retrieve_all` the search left the queue, so its timeout starts now.
+            event, start_times, name = signal
+            start_times[name] = started
+            event.set()
+        if lexical is None:
+            docs = self._retrieve_documents_by_vector(
+                store, embedding, include_scores=include_scores, k=k, exclude_oracle_ids=exclude_oracle_ids
+            )
+        else:
+            docs = self._retrieve_hybrid(
+                store, lexical, question, embedding, include_scores, k=k, exclude_oracle_ids=exclude_oracle_ids
+            )
+        return docs, time.monotonic() - started
+
+    def _retrieve_hybrid(
+        self,
+        store: VectorStore,
+        lexical: BM25Index,
+        question: str,
+        embedding: List[float],
+        include_scores: bool = True,
+        k: Optional[int] = None,
+        exclude_oracle_ids: Optional[List[str]] = None,
+    ) -> List:
+        """
+        Fuse vector and BM25 results for one corpus with reciprocal rank fusion.
+
+        Both rankers return `retrieval_candidates` hits (or `k`, if deeper); documents are keyed by their
+        text, scored by the sum of 1 / (RRF_K + rank) over the lists they appear in,
+        and the best `retrieval_k` are returned. The fused score, scaled so a document
+        ranked first by both lists gets 1.0, replaces `relevance_score` for budgeting.
+        """
+        depth = max(self.retrieval_candidates, k or 0)
+        vector_docs = self._retrieve_documents_by_vector(
+            store,
+            embedding,
+            include_scores=include_scores,
+            k=depth,
+            exclude_oracle_ids=exclude_oracle_ids,
+        )
+        try:
+            hits = lexical.search(question, depth)
+            lexical_docs = store.get([chunk_id for chunk_id, _ in hits])
+        except Exception:
+            lexical_docs = []
+        if exclude_oracle_ids:
+            excluded = set(exclude_oracle_ids)
+            lexical_docs = [doc for doc in lexical_docs if excluded.isdisjoint(document_oracle_ids(doc.metadata))]
+        by_key: Dict[str, Any] = {}
+        sources: Dict[str, set] = {}
+        for label, docs in (("vector", vector_docs), ("lexical", lexical_docs)):
+            for doc in docs:
+                by_key.setdefault(doc.page_content, doc)
+                sources.setdefault(doc.page_content, set()).add(label)
+        fused = reciprocal_rank_fusion(
+            [[doc.page_content for doc in vector_docs], [doc.page_content for doc in lexical_docs]], k=RRF_K
+        )
+        ranked = sorted(fused, key=fused.get, reverse=True)[: k or self.retrieval_k]
+        results = []
+        for key in ranked:
+            doc = by_key[key]
+            origin = sources[key]
+            doc.metadata = {
+                **(doc.metadata or {}),
+                "relevance_score": fused[key] * (RRF_K + 1) / 2,
+                "retrieval": "hybrid" if len(origin) > 1 else next(iter(origin)),
+            }
+            results.append(doc)
+        return results
+
+    def _retrieve_documents_by_vector(
+        self,
+        store: VectorStore,
+        embedding: List[float],
+        include_scores: bool = True,
+        k: Optional[int] = None,
+        exclude_oracle_ids: Optional[List[str]] = None,
+    ) -> List:
+        """Search one store with a precomputed query vector, dropping hits below `retrieval_threshold`."""
+        k = k or self.retrieval_k
+        try:
+            results = store.search(embedding, k, exclude_oracle_ids=exclude_oracle_ids)
         except Exception:
             return []
+        if not include_scores:
+            return [doc for doc, _ in results]
+        docs = []
+        for doc, score in results:
+            if score is not None and score < self.retrieval_threshold:
+                continue
+            # Kept on the document so the context budgeter can rank across corpora.
+            doc.metadata = {**(doc.metadata or {}), "relevance_score": score}
+            docs.append(doc)
+        return docs
 
     def _rule_ids_from_docs(self, docs: List) -> List[str]:
         if not docs:
@@ -557,12 +1339,13 @@ Question: {question}
         rule_ids: List[str] = []
         pattern = re.compile(r"(\d{3}\.\d+[a-z]?)")
         for doc in docs[:5]:
-            content = getattr(doc, "page_content", "") or ""
-            match = pattern.search(content)
-            if match:
-                candidate = match.group(1)
-                if candidate not in rule_ids:
-                    rule_ids.append(candidate)
+            candidate = (getattr(doc, "metadata", None) or {}).get("rule_id")
+            if not candidate:
+                # Chunks embedded before rule-aware chunking carry no metadata.
+                match = pattern.search(getattr(doc, "page_content", "") or "")
+                candidate = match.group(1) if match else None
+            if candidate and candidate not in rule_ids:
+                rule_ids.append(candidate)
         return rule_ids
 
     def _apply_postamble(self, text: str, citations: List[str], warnings: List[str]) -> str:
@@ -601,6 +1384,10 @@ _melvin_service: MelvinService | None = None
 _melvin_lock = threading.Lock()
 
 
+def melvin_service_loaded() -> bool:
+    return _melvin_service is not None
+
+
 def get_melvin_service() -> MelvinService:
     global _melvin_service
     if _melvin_service is None:
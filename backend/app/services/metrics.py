@@ -0,0 +1,55 @@
+"""Rolling per-stage latency statistics for the answer pipeline."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List
+
+from ..core.config import get_settings
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StageLatencyRecorder:
+    """Keeps the last `window` samples (in milliseconds) for every pipeline stage."""
+
+    def __init__(self, window: int = 500) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings_ms: Dict[str, float]) -> None:
+        with self._lock:
+            for stage, value in timings_ms.items():
+                samples = self._samples.get(stage)
+                if samples is None:
+                    samples = self._samples[stage] = deque(maxlen=self.window)
+                samples.append(value)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+        return {
+            stage: {
+                "count": len(ordered),
+                "p50_ms": round(_percentile(ordered, 0.50), 1),
+                "p95_ms": round(_percentile(ordered, 0.95), 1),
+                "max_ms": round(ordered[-1], 1) if ordered else 0.0,
+            }
+            for stage, ordered in snapshot.items()
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+stage_latency = StageLatencyRecorder(window=get_settings().latency_window_size)
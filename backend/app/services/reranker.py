@@ -0,0 +1,94 @@
+"""Optional cross-encoder rescoring of retrieved passages under a hard time budget."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import List, Optional, Sequence
+
+from ..core.config import get_settings
+
+
+class CrossEncoderReranker:
+    """
+    Scores (question, passage) pairs with a small CPU cross-encoder.
+
+    The model is loaded off the request path: the first `rerank` call (or the warm-up
+    step) starts a background load and returns None until it is ready, so a cold
+    model never costs a request its budget. Scoring runs in batches and stops as
+    soon as `deadline` passes; callers then keep their original order.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 16, max_length: int = 256) -> None:
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self._model = None
+        self._failed = False
+        self._loading: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+    def load(self) -> None:
+        """Load the model in the calling thread (used by warm-up)."""
+        with self._load_lock:
+            if self._model is not None or self._failed:
+                return
+            try:
+                from sentence_transformers import CrossEncoder
+
+                started = time.monotonic()
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+                print(f"[melvin] Loaded reranker {self.model_name} in {time.monotonic() - started:.1f}s")
+            except Exception as exc:
+                self._failed = True
+                print(f"[melvin] Reranker {self.model_name} unavailable ({exc}); keeping retrieval order")
+
+    def _ensure_loading(self) -> None:
+        with self._lock:
+            if self._model is not None or self._failed or self._loading is not None:
+                return
+            self._loading = threading.Thread(target=self.load, name="melvin-reranker-load", daemon=True)
+            self._loading.start()
+
+    def rerank(self, question: str, passages: Sequence[str], deadline: float) -> Optional[List[float]]:
+        """
+        Relevance in [0, 1] for each passage, or None when the model is not loaded yet
+        or `deadline` (a `time.monotonic()` value) passed before every batch was scored.
+        """
+        if self._model is None:
+            self._ensure_loading()
+            return None
+        scores: List[float] = []
+        for start in range(0, len(passages), self.batch_size):
+            if time.monotonic() >= deadline:
+                return None
+            batch = [(question, passage) for passage in passages[start : start + self.batch_size]]
+            logits = self._model.predict(batch, batch_size=self.batch_size, show_progress_bar=False)
+            scores.extend(1.0 / (1.0 + math.exp(-float(logit))) for logit in logits)
+        if time.monotonic() > deadline:
+            return None
+        return scores
+
+
+_reranker: CrossEncoderReranker | None = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> CrossEncoderReranker:
+    global _reranker
+    if _reranker is None:
+        with _reranker_lock:
+            if _reranker is None:
+                settings = get_settings()
+                _reranker = CrossEncoderReranker(settings.reranker_model, batch_size=settings.reranker_batch_size)
+    return _reranker
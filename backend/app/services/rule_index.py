@@ -0,0 +1,69 @@
+"""Exact Comprehensive Rules lookup by rule number."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional
+
+from .data_loader import datastore, rule_parent
+
+
+def normalize_rule_id(rule_id: str) -> str:
+    """"702.19B." -> "702.19b"."""
+    return (rule_id or "").strip().rstrip(".").lower()
+
+
+class RuleIndex:
+    """
+    Dict from rule number to text, plus the direct children of every rule.
+
+    Built once from `datastore.rules`, so "702.19" returns its lettered subrules and
+    "702" the rules of that section without touching the vector store.
+    """
+
+    def __init__(self) -> None:
+        self._text: Dict[str, str] = {}
+        self._children: Dict[str, List[str]] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def _ensure_built(self) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            if not datastore.rules:
+                datastore.load()
+            for rule in datastore.rules:
+                self._text[rule.identifier] = rule.text
+                parent = rule_parent(rule.identifier)
+                if parent is not None:
+                    self._children.setdefault(parent, []).append(rule.identifier)
+            self._built = True
+
+    def __contains__(self, rule_id: str) -> bool:
+        self._ensure_built()
+        return normalize_rule_id(rule_id) in self._text
+
+    def get(self, rule_id: str) -> Optional[str]:
+        self._ensure_built()
+        return self._text.get(normalize_rule_id(rule_id))
+
+    def children(self, rule_id: str) -> List[str]:
+        self._ensure_built()
+        return list(self._children.get(normalize_rule_id(rule_id), []))
+
+    def lookup(self, rule_id: str, include_children: bool = True) -> Optional[Dict[str, Any]]:
+        """Rule text with its parent and (optionally) direct children, or None if unknown."""
+        key = normalize_rule_id(rule_id)
+        text = self.get(key)
+        if text is None:
+            return None
+        result: Dict[str, Any] = {"rule_id": key, "text": text, "parent_id": rule_parent(key)}
+        if include_children:
+            result["children"] = [{"rule_id": child, "text": self._text[child]} for child in self.children(key)]
+        return result
+
+
+rule_index = RuleIndex()
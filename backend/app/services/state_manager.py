@@ -2,13 +2,54 @@
 
 from __future__ import annotations
 
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 from sqlalchemy.orm import Session
 
 from ..models.game_state import GameState
+from ..core.config import get_settings
 from ..core.database import SessionLocal
 
 
+class GameStateCache:
+    """Small TTL cache of board-state JSON keyed by GameState id, used on the chat path."""
+
+    def __init__(self, ttl_seconds: int = 30, max_entries: int = 64) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, Optional[dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, state_id: int) -> Tuple[bool, Optional[dict]]:
+        """Return (hit, state); `state` may be None for a cached miss."""
+        with self._lock:
+            cached = self._entries.get(state_id)
+            if cached is None:
+                return False, None
+            stored_at, state = cached
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[state_id]
+                return False, None
+            self._entries.move_to_end(state_id)
+            return True, state
+
+    def put(self, state_id: int, state: Optional[dict]) -> None:
+        with self._lock:
+            self._entries[state_id] = (time.monotonic(), state)
+            self._entries.move_to_end(state_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, state_id: int) -> None:
+        with self._lock:
+            self._entries.pop(state_id, None)
+
+
+game_state_cache = GameStateCache(ttl_seconds=get_settings().game_state_cache_ttl_seconds)
+
+
 class StateManager:
     """Simple CRUD wrapper around GameState model.
 
@@ -38,6 +79,26 @@ class StateManager:
     def get_state(self, state_id: int) -> Optional[GameState]:
         return self.db.get(GameState, state_id)
 
+    def get_state_payload(self, state_id: int) -> Optional[dict]:
+        """Primary-key fetch of just the `state` JSON, served from the TTL cache when fresh."""
+        hit, state = game_state_cache.get(state_id)
+        if hit:
+            return state
+        record = self.db.get(GameState, state_id)
+        state = record.state if record else None
+        game_state_cache.put(state_id, state)
+        return state
+
+    def latest_state_id(self, owner: str) -> Optional[int]:
+        """Id of the most recently updated board saved under `owner` (index on owner, updated_at)."""
+        return (
+            self.db.query(GameState.id)
+            .filter(GameState.owner == owner)
+            .order_by(GameState.updated_at.desc())
+            .limit(1)
+            .scalar()
+        )
+
     def list_states(self) -> list[GameState]:
         return self.db.query(GameState).order_by(GameState.updated_at.desc()).all()
 
@@ -49,6 +110,7 @@ class StateManager:
         self.db.add(record)
         self.db.commit()
         self.db.refresh(record)
+        game_state_cache.invalidate(state_id)
         return record
 
     def delete_state(self, state_id: int) -> bool:
@@ -57,6 +119,7 @@ class StateManager:
             return False
         self.db.delete(record)
         self.db.commit()
+        game_state_cache.invalidate(state_id)
         return True
 
 
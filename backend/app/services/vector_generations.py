@@ -0,0 +1,211 @@
+"""Blue/green generations of the vector stores with an atomic current pointer."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import get_settings
+from .vector_store import release_chroma_clients
+
+
+VECTORSTORE_CORPORA = ("rules", "cards", "rulings", "reference")
+# Stores written before generations existed live directly under chroma_db/.
+LEGACY_GENERATION = "legacy"
+# Per-generation record of the chunk ids (and source fingerprints) held by each store.
+GENERATION_MANIFEST = "manifest.json"
+
+
+class VectorStoreGenerations:
+    """
+    Layout under `data/processed/chroma_db/`:
+
+    - `generations/<id>/{rules,cards,rulings,reference}` - one complete set of stores
+      plus the `manifest.json` the ingest used to build it (including which vector
+      store backend wrote them).
+    - `CURRENT.json` - `{"generation": <id>, "building": <id>, "retired": [...]}`,
+      replaced atomically. Readers only ever open `generation`; `building` is the
+      generation an ingest is writing (kept across crashes so the next run resumes it).
+
+    Retired generations stay on disk for a grace period so requests still holding
+    their handles can finish, then `collect_garbage` removes them.
+    """
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        settings = get_settings()
+        self.root = root or settings.processed_data_dir / "chroma_db"
+        self.generations_dir = self.root / "generations"
+        self.pointer_path = self.root / "CURRENT.json"
+        self.grace_seconds = settings.vectorstore_gc_grace_seconds
+        self._lock = threading.Lock()
+
+    # --- readers ---------------------------------------------------------------
+
+    def read_pointer(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.pointer_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def pointer_stamp(self) -> Optional[int]:
+        """Cheap change marker for the pointer file (its mtime), None when absent."""
+        try:
+            return self.pointer_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def current(self) -> Tuple[str, Path]:
+        """Return (generation id, directory) that queries should read from."""
+        generation = self.read_pointer().get("generation")
+        if generation:
+            path = self.generation_path(generation)
+            if path.exists():
+                return generation, path
+        return LEGACY_GENERATION, self.root
+
+    def building(self) -> Optional[Tuple[str, Path]]:
+        generation = self.read_pointer().get("building")
+        if generation:
+            path = self.generation_path(generation)
+            if path.exists():
+                return generation, path
+        return None
+
+    def store_backend(self, path: Path) -> str:
+        """Vector store backend the generation at `path` was built with (Chroma before backends existed)."""
+        try:
+            manifest = json.loads((path / GENERATION_MANIFEST).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return "chroma"
+        return manifest.get("backend") or "chroma"
+
+    def generation_path(self, generation: str) -> Path:
+        if generation == LEGACY_GENERATION:
+            return self.root
+        return self.generations_dir / generation
+
+    # --- writers ---------------------------------------------------------------
+
+    def create(self, base: Tuple[str, Path], copy: bool = True) -> Tuple[str, Path]:
+        """Start a new generation as a copy of `base`, so unchanged chunks are not re-embedded."""
+        generation = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        target = self.generation_path(generation)
+        # Claim the id in the pointer first so garbage collection never sees it unreferenced.
+        with self._lock:
+            pointer = self.read_pointer()
+            pointer["building"] = generation
+            self._write_pointer(pointer)
+        target.mkdir(parents=True, exist_ok=False)
+        if not copy:
+            return generation, target
+        _, base_path = base
+        for name in VECTORSTORE_CORPORA:
+            source = base_path / name
+            if source.exists():
+                shutil.copytree(source, target / name)
+        return generation, target
+
+    def discard(self, generation: str) -> None:
+        """Drop an unfinished build that can no longer be resumed."""
+        with self._lock:
+            pointer = self.read_pointer()
+            if pointer.get("building") == generation:
+                pointer.pop("building")
+                self._write_pointer(pointer)
+        self._remove(generation)
+
+    def activate(self, generation: str) -> None:
+        """Point readers at `generation`; the previous one is retired, not deleted."""
+        with self._lock:
+            pointer = self.read_pointer()
+            previous = pointer.get("generation") or LEGACY_GENERATION
+            retired: List[Dict[str, Any]] = [
+                entry for entry in pointer.get("retired", []) if entry.get("generation") != generation
+            ]
+            if previous != generation:
+                retired.append({"generation": previous, "retired_at": time.time()})
+            pointer.update(
+                {
+                    "generation": generation,
+                    "activated_at": datetime.utcnow().isoformat(),
+                    "retired": retired,
+                }
+            )
+            if pointer.get("building") == generation:
+                pointer.pop("building")
+            self._write_pointer(pointer)
+        print(f"[melvin] Vector store generation {generation} is now current")
+        if self.grace_seconds > 0:
+            timer = threading.Timer(self.grace_seconds + 1, self.collect_garbage)
+            timer.daemon = True
+            timer.start()
+        else:
+            self.collect_garbage()
+
+    def collect_garbage(self) -> List[str]:
+        """Delete retired generations once their grace period has passed."""
+        removed: List[str] = []
+        with self._lock:
+            pointer = self.read_pointer()
+            current = pointer.get("generation")
+            if not current:
+                return removed
+            keep = pointer.get("building")
+            now = time.time()
+            remaining = []
+            for entry in pointer.get("retired", []):
+                generation = entry.get("generation")
+                if generation in (current, keep):
+                    continue
+                if now - float(entry.get("retired_at", now)) < self.grace_seconds:
+                    remaining.append(entry)
+                    continue
+                self._remove(generation)
+                removed.append(generation)
+            # Directories the pointer no longer references at all (e.g. discarded builds).
+            if self.generations_dir.exists():
+                tracked = {current, keep} | {entry.get("generation") for entry in remaining}
+                for path in self.generations_dir.iterdir():
+                    if path.name in tracked or not path.is_dir():
+                        continue
+                    self._remove_path(path)
+                    removed.append(path.name)
+            if len(remaining) != len(pointer.get("retired", [])):
+                pointer["retired"] = remaining
+                self._write_pointer(pointer)
+        for generation in removed:
+            print(f"[melvin] Removed vector store generation {generation}")
+        return removed
+
+    def _remove(self, generation: str) -> None:
+        if generation == LEGACY_GENERATION:
+            for name in VECTORSTORE_CORPORA:
+                self._remove_path(self.root / name)
+            return
+        self._remove_path(self.generation_path(generation))
+
+    @staticmethod
+    def _remove_path(path: Path) -> None:
+        # Chroma clients this process still caches for the directory would keep its files open.
+        release_chroma_clients(path)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _write_pointer(self, data: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.pointer_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
+            handle.flush()
+            os.fsync(handle.fileno())
+        tmp_path.replace(self.pointer_path)
+
+
+vector_generations = VectorStoreGenerations()
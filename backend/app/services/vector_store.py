@@ -0,0 +1,508 @@
+"""Per-corpus vector store backends behind one interface: Chroma or memory-mapped FAISS."""
+
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+os.environ.setdefault("CHROMA_TELEMETRY_ENABLED", "False")
+from langchain_community.vectorstores import Chroma
+from langchain_core.documents import Document
+
+
+VECTOR_STORE_BACKENDS = ("chroma", "faiss")
+DEFAULT_VECTOR_STORE_BACKEND = "chroma"
+
+
+def release_chroma_clients(path: Path) -> None:
+    """
+    Stop and forget chromadb's cached client systems for `path` and any directory
+    below it. chromadb keeps one system (SQLite connections, segment caches) per
+    persist directory for the life of the process, so a store that is swapped out
+    or deleted would otherwise stay open until the worker exits.
+    """
+    try:
+        from chromadb.api.client import SharedSystemClient
+    except ImportError:
+        return
+    target = Path(path).resolve()
+    for identifier in list(SharedSystemClient._identifer_to_system):
+        if not identifier:
+            continue
+        candidate = Path(identifier).resolve()
+        if candidate != target and target not in candidate.parents:
+            continue
+        system = SharedSystemClient._identifer_to_system.pop(identifier, None)
+        if system is None:
+            continue
+        try:
+            system.stop()
+        except Exception as exc:
+            print(f"[melvin] Could not stop the Chroma client for {identifier}: {exc}")
+
+
+def document_oracle_ids(metadata: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Every oracle id a chunk applies to. Deduplicated rulings list theirs in
+    `oracle_ids` ("|"-joined, since store metadata cannot hold lists); other chunks
+    carry at most a single `oracle_id`.
+    """
+    metadata = metadata or {}
+    joined = metadata.get("oracle_ids")
+    if joined:
+        return joined.split("|")
+    return [metadata["oracle_id"]] if metadata.get("oracle_id") else []
+
+
+class VectorStore(ABC):
+    """
+    What `MelvinService` and `IngestService` need from one corpus' store.
+
+    `search` returns (document, relevance) pairs, best first, with relevance on the
+    scale Chroma's default L2 space gives normalized MiniLM vectors, so
+    `retrieval_threshold` means the same for every backend. Writes may be buffered
+    until `flush` (a cheap checkpoint) and reorganized by `compact`, which ingest
+    calls once a corpus is complete.
+    """
+
+    backend = ""
+
+    @abstractmethod
+    def search(
+        self, embedding: Sequence[float], k: int, exclude_oracle_ids: Optional[Sequence[str]] = None
+    ) -> List[Tuple[Document, Optional[float]]]:
+        """Nearest chunks to `embedding`; `exclude_oracle_ids` drops chunks tagged with any of them."""
+
+    @abstractmethod
+    def get(self, ids: Sequence[str]) -> List[Document]:
+        """Stored chunks by id, in the order given; unknown ids are skipped."""
+
+    @abstractmethod
+    def upsert(self, ids: Sequence[str], documents: Sequence[Document], vectors: Sequence[Sequence[float]]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, ids: Sequence[str]) -> None:
+        ...
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Drop every chunk."""
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    def flush(self) -> None:
+        """Make every write so far durable."""
+
+    def compact(self) -> None:
+        """Flush, then fold checkpointed writes into the layout queries read."""
+        self.flush()
+
+    def close(self) -> None:
+        """Release open files and clients; the store must not be used afterwards."""
+
+
+class ChromaVectorStore(VectorStore):
+    backend = "chroma"
+
+    def __init__(self, path: Path, embedding_function: Any = None) -> None:
+        self.path = path
+        self.embedding_function = embedding_function
+        self.store = Chroma(persist_directory=str(path), embedding_function=embedding_function)
+
+    def search(self, embedding, k, exclude_oracle_ids=None):
+        # Chroma can only filter on the primary oracle_id; the other ids of merged rulings are checked below.
+        where = {"oracle_id": {"$nin": list(exclude_oracle_ids)}} if exclude_oracle_ids else None
+        results = self.store.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=where)
+        # The by-vector search returns raw distances; convert them with the store's own relevance function.
+        relevance = self.store._select_relevance_score_fn()
+        excluded = set(exclude_oracle_ids or ())
+        return [
+            (doc, None if distance is None else relevance(distance))
+            for doc, distance in results
+            if not excluded or excluded.isdisjoint(document_oracle_ids(doc.metadata))
+        ]
+
+    def get(self, ids):
+        if not ids:
+            return []
+        payload = self.store.get(ids=list(ids), include=["documents", "metadatas"])
+        found = {
+            chunk_id: Document(page_content=text or "", metadata=dict(metadata or {}))
+            for chunk_id, text, metadata in zip(payload["ids"], payload["documents"], payload["metadatas"])
+        }
+        return [found[chunk_id] for chunk_id in ids if chunk_id in found]
+
+    def upsert(self, ids, documents, vectors):
+        """Upsert precomputed embeddings straight into the Chroma collection."""
+        # Chroma rejects empty metadata dicts, so chunks with and without metadata go separately.
+        with_meta = [i for i, document in enumerate(documents) if document.metadata]
+        without_meta = [i for i, document in enumerate(documents) if not document.metadata]
+        if with_meta:
+            self.store._collection.upsert(
+                ids=[ids[i] for i in with_meta],
+                embeddings=[vectors[i] for i in with_meta],
+                documents=[documents[i].page_content for i in with_meta],
+                metadatas=[documents[i].metadata for i in with_meta],
+            )
+        if without_meta:
+            self.store._collection.upsert(
+                ids=[ids[i] for i in without_meta],
+                embeddings=[vectors[i] for i in without_meta],
+                documents=[documents[i].page_content for i in without_meta],
+            )
+
+    def delete(self, ids):
+        if ids:
+            self.store.delete(ids=list(ids))
+
+    def reset(self):
+        self.store.delete_collection()
+        self.store = Chroma(persist_directory=str(self.path), embedding_function=self.embedding_function)
+
+    def count(self):
+        return self.store._collection.count()
+
+    def close(self):
+        release_chroma_clients(self.path)
+
+
+class FaissVectorStore(VectorStore):
+    """
+    Exact inner-product search with `faiss.knn` over vectors kept in a memory-mapped file.
+
+    This is brute force on purpose, not a serialized FAISS index: faiss-cpu 1.7.4
+    reads a flat index fully into memory even with `IO_FLAG_MMAP` (about 200 MB
+    resident for 150 MB of vectors), whereas `faiss.knn` over an `np.memmap` scans the
+    page-cached file that every uvicorn worker shares. At these corpus sizes an exact
+    scan costs milliseconds, so an approximate index would add build time and recall
+    loss for nothing.
+
+    Files in the corpus directory:
+
+    - `vectors.f32` - float32 rows, one per chunk (MiniLM vectors are normalized,
+      so inner product is cosine similarity).
+    - `ids.npy` - chunk id per row, fixed-width bytes.
+    - `records.jsonl` + `offsets.npy` - `[text, metadata]` per row as compact JSON and
+      the byte offset of each line, so a hit decodes only its own record.
+    - `faiss.json` - row count and dimension, written last.
+    - `journal.f32` + `journal.jsonl` - writes since the last `compact`: appended
+      vectors, and one line per upsert or delete in call order.
+
+    Queries read only the first four, with mmap, so opening is instant. Ingest
+    checkpoints with `flush`, which appends just the writes buffered since the last
+    one, and `compact` rewrites the base files once when the corpus is done, so a
+    generation is never published with a pending journal.
+    """
+
+    backend = "faiss"
+    HEADER = "faiss.json"
+    JOURNAL = "journal.jsonl"
+    JOURNAL_VECTORS = "journal.f32"
+    BASE_FILES = ("vectors.f32", "ids.npy", "offsets.npy", "records.jsonl")
+    # Rows copied per step while compacting, to bound the memory the rewrite needs.
+    COPY_ROWS = 4096
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._count = 0
+        self._dim = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._records: Optional[mmap.mmap] = None
+        self._row_by_id: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+        # Writes not yet flushed, in call order: (chunk id, (vector, text, metadata) or None for a delete).
+        self._pending: List[Tuple[str, Optional[Tuple[np.ndarray, str, Dict[str, Any]]]]] = []
+        # Journal state, read on the first write: chunk id -> still present after its last journal entry.
+        self._journaled: Optional[Dict[str, bool]] = None
+        self._journal_dim = 0
+        self._journal_rows = 0
+        if (self.path / f"{self.HEADER}.tmp").exists():
+            self._swap_in_compacted()
+        self._open()
+
+    def _open(self) -> None:
+        self._close()
+        try:
+            header = json.loads((self.path / self.HEADER).read_text(encoding="utf-8"))
+            count, dim = int(header["count"]), int(header["dim"])
+        except (FileNotFoundError, KeyError, ValueError):
+            return
+        if count == 0:
+            self._dim = dim
+            return
+        try:
+            vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r", shape=(count, dim))
+            ids = np.load(self.path / "ids.npy", mmap_mode="r")
+            offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+            with (self.path / "records.jsonl").open("rb") as handle:
+                records = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            print(f"[melvin] Unreadable FAISS store at {self.path} ({exc}); treating it as empty")
+            return
+        if len(ids) != count or len(offsets) != count + 1:
+            print(f"[melvin] FAISS store at {self.path} does not match its header; treating it as empty")
+            records.close()
+            return
+        self._count, self._dim = count, dim
+        self._vectors, self._ids, self._offsets, self._records = vectors, ids, offsets, records
+
+    def _close(self) -> None:
+        if self._records is not None:
+            self._records.close()
+        self._count = 0
+        self._vectors = self._ids = self._offsets = self._records = None
+        self._row_by_id = None
+
+    def close(self):
+        self._close()
+
+    def _document(self, row: int) -> Document:
+        text, metadata = json.loads(self._records[int(self._offsets[row]) : int(self._offsets[row + 1])])
+        return Document(page_content=text, metadata=metadata)
+
+    def _rows_by_id(self) -> Dict[str, int]:
+        if self._row_by_id is None:
+            with self._lock:
+                if self._row_by_id is None:
+                    ids = self._ids if self._ids is not None else ()
+                    self._row_by_id = {chunk_id.decode("ascii"): row for row, chunk_id in enumerate(ids)}
+        return self._row_by_id
+
+    @staticmethod
+    def _relevance(inner_product: float) -> float:
+        # Chroma's L2 space reports squared distance, 2 - 2 * cosine for unit vectors,
+        # and LangChain maps it to 1 - distance / sqrt(2); do the same here.
+        return 1.0 - (2.0 - 2.0 * float(inner_product)) / math.sqrt(2)
+
+    def search(self, embedding, k, exclude_oracle_ids=None):
+        import faiss
+
+        if self._count == 0 or k <= 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        excluded = set(exclude_oracle_ids or ())
+        # Metadata filters are applied after the search; widen it until enough survive.
+        depth = min(self._count, k * 4 if excluded else k)
+        while True:
+            scores, rows = faiss.knn(query, self._vectors, depth, faiss.METRIC_INNER_PRODUCT)
+            results: List[Tuple[Document, Optional[float]]] = []
+            for score, row in zip(scores[0], rows[0]):
+                if row < 0:
+                    continue
+                document = self._document(int(row))
+                if excluded and not excluded.isdisjoint(document_oracle_ids(document.metadata)):
+                    continue
+                results.append((document, self._relevance(score)))
+                if len(results) == k:
+                    return results
+            if depth >= self._count:
+                return results
+            depth = min(self._count, depth * 4)
+
+    def get(self, ids):
+        if not ids or self._count == 0:
+            return []
+        row_by_id = self._rows_by_id()
+        rows = [row_by_id.get(chunk_id) for chunk_id in ids]
+        return [self._document(row) for row in rows if row is not None]
+
+    def _journal_entries(self) -> Iterator[Tuple[int, int, Any]]:
+        """(start, end, entry) for each complete journal line; stops at a torn or corrupt tail."""
+        path = self.path / self.JOURNAL
+        if not path.exists():
+            return
+        position = 0
+        with path.open("rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    return
+                yield position, position + len(line), entry
+                position += len(line)
+
+    def _load_journal(self) -> Dict[str, bool]:
+        """Replay the journal left by earlier checkpoints and cut off anything an interrupted flush left behind."""
+        if self._journaled is None:
+            journaled: Dict[str, bool] = {}
+            dim, rows, valid_bytes = self._dim, 0, 0
+            for _, end, entry in self._journal_entries():
+                if isinstance(entry, dict):
+                    dim = int(entry["dim"])
+                elif entry[0] == "u":
+                    journaled[entry[1]] = True
+                    rows = entry[2] + 1
+                else:
+                    journaled[entry[1]] = False
+                valid_bytes = end
+            for name, size in ((self.JOURNAL, valid_bytes), (self.JOURNAL_VECTORS, rows * dim * 4)):
+                target = self.path / name
+                if target.exists() and target.stat().st_size > size:
+                    os.truncate(target, size)
+            self._journaled, self._journal_dim, self._journal_rows = journaled, dim, rows
+        return self._journaled
+
+    def _changes(self) -> Dict[str, bool]:
+        changes = dict(self._load_journal())
+        for chunk_id, row in self._pending:
+            changes[chunk_id] = row is not None
+        return changes
+
+    def upsert(self, ids, documents, vectors):
+        for chunk_id, document, vector in zip(ids, documents, vectors):
+            row = (np.asarray(vector, dtype=np.float32), document.page_content, document.metadata or {})
+            self._pending.append((chunk_id, row))
+
+    def delete(self, ids):
+        self._pending.extend((chunk_id, None) for chunk_id in ids)
+
+    def reset(self):
+        self._pending = []
+        # Without a header the store reads as empty, whatever else is left on disk.
+        (self.path / self.HEADER).unlink(missing_ok=True)
+        self._close()
+        for name in (*self.BASE_FILES, self.JOURNAL, self.JOURNAL_VECTORS):
+            (self.path / name).unlink(missing_ok=True)
+        (self.path / f"{self.HEADER}.tmp").unlink(missing_ok=True)
+        self._dim = 0
+        self._journaled, self._journal_dim, self._journal_rows = {}, 0, 0
+
+    def count(self):
+        changes = self._changes()
+        if not changes:
+            return self._count
+        base = self._rows_by_id()
+        return self._count - sum(1 for chunk_id in changes if chunk_id in base) + sum(changes.values())
+
+    def flush(self):
+        """Append the buffered writes to the journal; earlier checkpoints are not rewritten."""
+        if not self._pending:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        journaled = self._load_journal()
+        lines: List[Any] = []
+        vectors: List[np.ndarray] = []
+        for chunk_id, row in self._pending:
+            if row is None:
+                lines.append(["d", chunk_id])
+                journaled[chunk_id] = False
+                continue
+            vector, text, metadata = row
+            if not self._journal_dim:
+                self._journal_dim = len(vector)
+                lines.append({"dim": self._journal_dim})
+            lines.append(["u", chunk_id, self._journal_rows + len(vectors), text, metadata])
+            vectors.append(vector)
+            journaled[chunk_id] = True
+        # Vectors go first: a journal line only counts once the row it points at is on disk.
+        if vectors:
+            with (self.path / self.JOURNAL_VECTORS).open("ab") as handle:
+                handle.write(np.stack(vectors).astype(np.float32).tobytes())
+            self._journal_rows += len(vectors)
+        with (self.path / self.JOURNAL).open("ab") as handle:
+            handle.write(
+                b"".join(
+                    json.dumps(line, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                    for line in lines
+                )
+            )
+        self._pending = []
+
+    def compact(self):
+        """Rewrite the base files with the journal applied, then drop the journal."""
+        self.flush()
+        journaled = self._load_journal()
+        if not journaled and (self.path / self.HEADER).exists():
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        # The last upsert of each chunk still present wins; earlier ones are superseded.
+        latest: Dict[str, Tuple[int, int]] = {}
+        for start, end, entry in self._journal_entries():
+            if isinstance(entry, list):
+                if entry[0] == "u" and journaled.get(entry[1]):
+                    latest[entry[1]] = (start, end)
+                else:
+                    latest.pop(entry[1], None)
+        kept = [row for row in range(self._count) if self._ids[row].decode("ascii") not in journaled]
+        dim = self._journal_dim or self._dim
+        journal_vectors = None
+        if latest:
+            journal_vectors = np.memmap(
+                self.path / self.JOURNAL_VECTORS, dtype=np.float32, mode="r", shape=(self._journal_rows, dim)
+            )
+        ids: List[bytes] = []
+        offsets = [0]
+        with (self.path / "vectors.f32.tmp").open("wb") as vectors_out, (
+            self.path / "records.jsonl.tmp"
+        ).open("wb") as records_out:
+            for start in range(0, len(kept), self.COPY_ROWS):
+                rows = kept[start : start + self.COPY_ROWS]
+                vectors_out.write(np.ascontiguousarray(self._vectors[rows]).tobytes())
+                for row in rows:
+                    # Untouched rows keep their encoded record byte for byte.
+                    record = self._records[int(self._offsets[row]) : int(self._offsets[row + 1])]
+                    records_out.write(record)
+                    offsets.append(offsets[-1] + len(record))
+                    ids.append(bytes(self._ids[row]))
+            if latest:
+                with (self.path / self.JOURNAL).open("rb") as journal:
+                    for chunk_id, (start, end) in sorted(latest.items(), key=lambda item: item[1]):
+                        journal.seek(start)
+                        _, _, row, text, metadata = json.loads(journal.read(end - start))
+                        vectors_out.write(np.ascontiguousarray(journal_vectors[row]).tobytes())
+                        record = json.dumps([text, metadata], ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                        records_out.write(record)
+                        offsets.append(offsets[-1] + len(record))
+                        ids.append(chunk_id.encode("ascii"))
+        with (self.path / "ids.npy.tmp").open("wb") as handle:
+            np.save(handle, np.asarray(ids, dtype=np.bytes_) if ids else np.zeros(0, dtype="S1"))
+        with (self.path / "offsets.npy.tmp").open("wb") as handle:
+            np.save(handle, np.asarray(offsets, dtype=np.int64))
+        del journal_vectors
+        # The temporary header is the commit point: once it exists every new file is complete.
+        tmp_header = self.path / f"{self.HEADER}.tmp"
+        tmp_header.write_text(json.dumps({"count": len(ids), "dim": int(dim)}), encoding="utf-8")
+        self._close()
+        self._swap_in_compacted()
+        self._open()
+
+    def _swap_in_compacted(self) -> None:
+        """
+        Move a finished compaction into place and drop the journal it absorbed. Also run
+        on open, so a crash part way through is completed instead of mixing old and new files.
+        """
+        # Without a header the store reads as empty while the files are replaced one by one.
+        (self.path / self.HEADER).unlink(missing_ok=True)
+        for name in self.BASE_FILES:
+            tmp_path = self.path / f"{name}.tmp"
+            if tmp_path.exists():
+                tmp_path.replace(self.path / name)
+        (self.path / f"{self.HEADER}.tmp").replace(self.path / self.HEADER)
+        for name in (self.JOURNAL, self.JOURNAL_VECTORS):
+            (self.path / name).unlink(missing_ok=True)
+        self._journaled, self._journal_dim, self._journal_rows = None, 0, 0
+
+
+def open_vector_store(path: Path, backend: str, embedding_function: Any = None) -> VectorStore:
+    """Open (or create) the store for one corpus directory with the given backend."""
+    if backend == "faiss":
+        return FaissVectorStore(path)
+    if backend != "chroma":
+        print(f"[melvin] Unknown vector store backend '{backend}'; using chroma")
+    return ChromaVectorStore(path, embedding_function)
@@ -0,0 +1,118 @@
+"""Optional eager warm-up of the Melvin stack so the first question is not the slow one."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+import requests
+
+from ..core.config import get_settings
+
+
+class WarmupTracker:
+    """Records per-component readiness for the warm-up run."""
+
+    def __init__(self) -> None:
+        self._components: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+        self.enabled = False
+
+    def mark(self, component: str, status: str, **details: object) -> None:
+        with self._lock:
+            entry = self._components.setdefault(component, {})
+            entry["status"] = status
+            entry.update(details)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            components = {name: dict(entry) for name, entry in self._components.items()}
+        ready = bool(components) and all(entry.get("status") == "ready" for entry in components.values())
+        return {"enabled": self.enabled, "ready": ready, "components": components}
+
+
+warmup_tracker = WarmupTracker()
+
+
+def _warm_melvin_service() -> None:
+    from .melvin import get_melvin_service
+
+    # Loads the Oracle/rulings/rules dumps and opens the Chroma stores (MiniLM loads on first embed).
+    get_melvin_service()
+
+
+def _warm_embedding() -> None:
+    from .embeddings import embedding_provider
+
+    # Loads the shared model; the first encode also pays for lazy kernel/tokenizer initialisation.
+    embedding_provider.embed_query("warm up")
+
+
+def _warm_reranker() -> None:
+    settings = get_settings()
+    if not settings.reranker_enabled:
+        return
+    from .reranker import get_reranker
+
+    # Until the cross-encoder is loaded, requests skip reranking instead of waiting for it.
+    get_reranker().load()
+
+
+def _warm_card_detector() -> None:
+    from .card_detector import card_name_detector
+
+    card_name_detector.detect("Sol Ring")
+
+
+def _warm_knowledge_store() -> None:
+    from .knowledge import knowledge_store
+
+    knowledge_store.get_card("Sol Ring")
+
+
+def _warm_ollama() -> None:
+    from .melvin import get_melvin_service
+
+    settings = get_settings()
+    model = get_melvin_service().model_name
+    # An empty prompt makes Ollama load the model into memory without generating.
+    resp = requests.post(
+        f"http://{settings.ollama_host}:{settings.ollama_port}/api/generate",
+        json={"model": model, "prompt": "", "keep_alive": settings.ollama_keep_alive},
+        timeout=settings.warmup_ollama_timeout_seconds,
+    )
+    resp.raise_for_status()
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("melvin_service", _warm_melvin_service),
+    ("embedding", _warm_embedding),
+    ("reranker", _warm_reranker),
+    ("card_detector", _warm_card_detector),
+    ("knowledge_store", _warm_knowledge_store),
+    ("ollama", _warm_ollama),
+]
+
+
+def run_warmup() -> None:
+    """Build every component in order; a failing step is reported and does not stop the rest."""
+    warmup_tracker.enabled = True
+    for name, _ in WARMUP_STEPS:
+        warmup_tracker.mark(name, "pending")
+    for name, step in WARMUP_STEPS:
+        warmup_tracker.mark(name, "loading")
+        started = time.monotonic()
+        try:
+            step()
+        except Exception as exc:
+            warmup_tracker.mark(name, "failed", seconds=round(time.monotonic() - started, 2), error=str(exc))
+            print(f"[melvin] Warm-up step '{name}' failed: {exc}")
+            continue
+        warmup_tracker.mark(name, "ready", seconds=round(time.monotonic() - started, 2))
+
+
+def start_warmup_thread() -> threading.Thread:
+    thread = threading.Thread(target=run_warmup, name="melvin-warmup", daemon=True)
+    thread.start()
+    return thread
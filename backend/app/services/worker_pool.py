@@ -0,0 +1,156 @@
+"""Dedicated, size-limited worker pool for the blocking Melvin answer pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Tuple, TypeVar
+
+from ..core.config import get_settings
+
+
+T = TypeVar("T")
+_EXHAUSTED = object()
+
+
+class PipelineBusyError(Exception):
+    """Raised when every worker is busy and the admission queue is full."""
+
+    def __init__(self, retry_after: int, queued: int) -> None:
+        super().__init__("Melvin is busy answering other questions")
+        self.retry_after = retry_after
+        self.queued = queued
+
+
+class AdmissionTicket:
+    """A reserved slot in the pool; release it once the request is finished."""
+
+    def __init__(self, pool: "AnswerWorkerPool", queue_position: int) -> None:
+        self.pool = pool
+        self.queue_position = queue_position
+        self._released = False
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool.executor, functools.partial(func, *args, **kwargs))
+
+    async def iterate(self, func: Callable[..., Iterator[T]], *args: Any, **kwargs: Any) -> AsyncIterator[T]:
+        """
+        Call `func` and drain the iterator it returns in a single pool task, yielding each
+        item back on the event loop.
+
+        The stream holds its worker until it ends, so a request admitted later cannot take
+        the thread between two items. If the consumer stops early (client disconnected),
+        the iterator is closed on the worker after its next item.
+        """
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]" = asyncio.Queue()
+        stopped = threading.Event()
+
+        def emit(item: Any, error: Optional[BaseException] = None) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                # The event loop is gone (shutdown); nobody is listening any more.
+                stopped.set()
+
+        def drain() -> None:
+            iterator = None
+            try:
+                iterator = func(*args, **kwargs)
+                for item in iterator:
+                    if stopped.is_set():
+                        break
+                    emit(item)
+            except BaseException as exc:
+                emit(_EXHAUSTED, exc)
+                return
+            finally:
+                close = getattr(iterator, "close", None)
+                if stopped.is_set() and close is not None:
+                    close()
+            emit(_EXHAUSTED)
+
+        loop.run_in_executor(self.pool.executor, drain)
+        try:
+            while True:
+                item, error = await queue.get()
+                if error is not None:
+                    raise error
+                if item is _EXHAUSTED:
+                    return
+                yield item
+        finally:
+            stopped.set()
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.pool._release()
+
+
+class AnswerWorkerPool:
+    """
+    Runs answer generation off the event loop on `max_workers` threads.
+
+    Up to `max_queue` further requests may wait for a worker; anything beyond that is
+    rejected immediately with `PipelineBusyError` so lightweight endpoints (health
+    checks, conversation lists) never queue behind LLM calls.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after_seconds: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after_seconds = retry_after_seconds
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="melvin-answer")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def admit(self) -> AdmissionTicket:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                raise PipelineBusyError(self.retry_after_seconds, self._in_flight - self.max_workers)
+            self._in_flight += 1
+            position = max(0, self._in_flight - self.max_workers)
+        return AdmissionTicket(self, position)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        ticket = self.admit()
+        try:
+            return await ticket.run(func, *args, **kwargs)
+        finally:
+            ticket.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.max_queue,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.max_workers),
+        }
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+
+_answer_pool: AnswerWorkerPool | None = None
+_answer_pool_lock = threading.Lock()
+
+
+def get_answer_pool() -> AnswerWorkerPool:
+    global _answer_pool
+    if _answer_pool is None:
+        with _answer_pool_lock:
+            if _answer_pool is None:
+                settings = get_settings()
+                _answer_pool = AnswerWorkerPool(
+                    max_workers=settings.answer_workers,
+                    max_queue=settings.answer_queue_limit,
+                    retry_after_seconds=settings.answer_retry_after_seconds,
+                )
+    return _answer_pool
@@ -0,0 +1,38 @@
+from app.services.card_detector import CardNameDetector
+from app.services.data_loader import CardEntry
+
+
+def _detector(*names: str) -> CardNameDetector:
+    detector = CardNameDetector()
+    detector._build([CardEntry(name=name, oracle_id=None, type_line=None, oracle_text=None) for name in names])
+    detector._built = True
+    return detector
+
+
+def _detected(detector: CardNameDetector, text: str) -> list[str]:
+    return [entry.name for entry in detector.detect(text)]
+
+
+def test_sentence_initial_single_word_is_not_a_card():
+    detector = _detector("Flash", "Fear", "Wish", "Vigilance", "Counterspell")
+    assert _detected(detector, "Flash lets me cast it at instant speed, right?") == []
+    assert _detected(detector, "Counterspell targets a spell. Vigilance means it doesn't tap.") == []
+
+
+def test_single_word_mid_sentence_or_quoted_is_a_card():
+    detector = _detector("Flash", "Counterspell")
+    assert _detected(detector, "Can I respond to Counterspell?") == ["Counterspell"]
+    assert _detected(detector, '"Flash" the card, not the keyword: how does it work?') == ["Flash"]
+    assert _detected(detector, "[Counterspell] on a land?") == ["Counterspell"]
+
+
+def test_multi_word_names_need_more_than_grammar_capitalization():
+    detector = _detector("Cast Out", "Time Walk", "Lightning Bolt")
+    assert _detected(detector, "Cast out the demon") == []
+    assert _detected(detector, "how does time walk work") == []
+    assert _detected(detector, "Cast Out exiles it. Does Lightning Bolt kill it?") == ["Cast Out", "Lightning Bolt"]
+
+
+def test_uncovered_capitalized_spans_skip_detected_names():
+    detector = _detector("Sol Ring")
+    assert detector.uncovered_capitalized_spans("Does Sol Ring plus Mana Vualt work?") == ["mana vualt"]
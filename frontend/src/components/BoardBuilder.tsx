@@ -43,7 +43,7 @@ export default function BoardBuilder() {
     try {
       const res = await api.get(`/game_state/${stateId}`);
       const question = `Given this board state: ${JSON.stringify(res.data.state)} what will happen if players pass priority?`;
-      const chatRes = await api.post('/conversations/1/chat', { question });
+      const chatRes = await api.post('/conversations/1/chat', { question, game_state_id: stateId });
       alert(chatRes.data.content);
     } catch (e:any) { alert(e.response?.data?.detail ?? 'Failed to analyze'); }
   };
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Compare the MiniLM embedding backends on this machine.
+
+Usage:
+  python scripts/benchmark_embeddings.py
+  python scripts/benchmark_embeddings.py --backends torch,onnx-int8 --docs 5000 --k 10
+
+Each backend runs in its own process (so load time and resident memory are not
+polluted by the others) over the same corpus sample from the Comprehensive Rules and
+the same judge-style queries. Reported per backend:
+
+  load_s       time to construct the embedding function
+  rss_mb       resident memory of the worker after embedding the corpus
+  query_p50/95 single-query embed latency in milliseconds
+  docs_per_s   batch throughput while embedding the corpus
+  recall@k     overlap of each query's top-k documents with the PyTorch top-k
+  cosine       mean cosine between this backend's and PyTorch's document vectors
+
+Export the ONNX models first with scripts/export_onnx_embeddings.py.
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+QUERIES = [
+    "What is banding?",
+    "How does cascade work?",
+    "What happens when I cast a spell with storm?",
+    "Can I counter a spell that can't be countered?",
+    "If my commander dies twice, how much commander tax is applied?",
+    "What does 702.19b say about trample?",
+    "When does a player lose the game for drawing from an empty library?",
+    "How do replacement effects from two permanents apply to the same event?",
+    "What is the legend rule?",
+    "Can I respond to a triggered ability before it goes on the stack?",
+    "How does deathtouch interact with trample damage assignment?",
+    "What happens to auras when the enchanted creature phases out?",
+    "Does hexproof stop my own spells from targeting my creature?",
+    "How are state-based actions checked?",
+    "What is the difference between exile and the command zone?",
+    "How does the stack resolve when both players pass priority?",
+]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            pages = int(handle.read().split()[1])
+        import os
+
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_backend(backend, corpus, queries, repeats, threads, results):
+    from app.services.embeddings import create_embedding_function
+
+    started = time.perf_counter()
+    embeddings = create_embedding_function(backend, threads=threads)
+    load_seconds = time.perf_counter() - started
+    embeddings.embed_query("warm up")
+
+    latencies = []
+    query_vectors = []
+    for _ in range(repeats):
+        for query in queries:
+            started = time.perf_counter()
+            vector = embeddings.embed_query(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if len(query_vectors) < len(queries):
+                query_vectors.append(vector)
+
+    started = time.perf_counter()
+    doc_vectors = embeddings.embed_documents(corpus)
+    throughput = len(corpus) / (time.perf_counter() - started)
+    latencies.sort()
+    results.put(
+        {
+            "backend": backend,
+            "implementation": type(embeddings).__name__,
+            "load_s": load_seconds,
+            "rss_mb": _rss_mb(),
+            "query_p50": statistics.median(latencies),
+            "query_p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+            "docs_per_s": throughput,
+            "query_vectors": query_vectors,
+            "doc_vectors": doc_vectors,
+        }
+    )
+
+
+def _load_corpus(limit: int):
+    from app.services.data_loader import datastore, parse_rule_lines
+
+    with datastore.rules_path.open("r", encoding="utf-8", errors="ignore") as handle:
+        rules = [f"{identifier}: {text}" for identifier, text in parse_rule_lines(handle) if "." in identifier]
+    return rules[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8", help="Comma-separated; torch is the baseline")
+    parser.add_argument("--docs", type=int, default=2000, help="Rules sampled as the corpus")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5, help="Passes over the query set for latency")
+    parser.add_argument("--threads", type=int, default=None, help="Intra-op threads per backend (default: runtime default)")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    if "torch" not in backends:
+        backends.insert(0, "torch")
+    corpus = _load_corpus(args.docs)
+    print(f"Corpus: {len(corpus)} rules, {len(QUERIES)} queries, k={args.k}")
+
+    context = multiprocessing.get_context("spawn")
+    runs = {}
+    for backend in backends:
+        results = context.Queue()
+        process = context.Process(
+            target=_run_backend, args=(backend, corpus, QUERIES, args.repeats, args.threads, results)
+        )
+        process.start()
+        runs[backend] = results.get()
+        process.join()
+
+    baseline = runs["torch"]
+    base_docs = np.asarray(baseline["doc_vectors"], dtype=np.float32)
+    base_top = np.argsort(-(np.asarray(baseline["query_vectors"], dtype=np.float32) @ base_docs.T), axis=1)[:, : args.k]
+
+    header = f"{'backend':<10} {'impl':<24} {'load_s':>7} {'rss_mb':>7} {'q_p50':>7} {'q_p95':>7} {'docs/s':>8} {'recall@' + str(args.k):>10} {'cosine':>7}"
+    print(header)
+    print("-" * len(header))
+    for backend in backends:
+        run = runs[backend]
+        docs = np.asarray(run["doc_vectors"], dtype=np.float32)
+        top = np.argsort(-(np.asarray(run["query_vectors"], dtype=np.float32) @ docs.T), axis=1)[:, : args.k]
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top, base_top)])
+        norms = np.linalg.norm(docs, axis=1) * np.linalg.norm(base_docs, axis=1)
+        cosine = float(np.mean(np.sum(docs * base_docs, axis=1) / np.clip(norms, 1e-12, None)))
+        print(
+            f"{backend:<10} {run['implementation']:<24} {run['load_s']:>7.2f} {run['rss_mb']:>7.0f} "
+            f"{run['query_p50']:>7.1f} {run['query_p95']:>7.1f} {run['docs_per_s']:>8.1f} {recall:>10.3f} {cosine:>7.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
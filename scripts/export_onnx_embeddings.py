@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Export the MiniLM embedding model to ONNX (fp32 and dynamically quantized int8).
+
+Usage:
+  python scripts/export_onnx_embeddings.py                 # writes to EMBEDDING_ONNX_DIR
+  python scripts/export_onnx_embeddings.py --output /tmp/minilm-onnx
+
+Needs the full PyTorch stack (sentence-transformers) plus onnxruntime once; the API can
+then run with EMBEDDING_BACKEND=onnx or onnx-int8 without loading PyTorch.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core.config import get_settings
+from app.services.embeddings import EMBEDDING_MODEL_NAME, ONNX_MODEL_FILES
+
+
+def export(output: Path, opset: int) -> None:
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    output.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    # tokenizer.json is all the `tokenizers` runtime needs at query time.
+    tokenizer.save_pretrained(str(output))
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    inputs = (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"])
+    fp32_path = output / ONNX_MODEL_FILES["onnx"]
+    dynamic = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            inputs,
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": dynamic,
+                "attention_mask": dynamic,
+                "token_type_ids": dynamic,
+                "last_hidden_state": dynamic,
+            },
+            opset_version=opset,
+        )
+    print(f"Wrote {fp32_path}")
+
+    int8_path = output / ONNX_MODEL_FILES["onnx-int8"]
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    print(f"Wrote {int8_path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=None, help="Target directory (default: EMBEDDING_ONNX_DIR)")
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+    export(args.output or get_settings().embedding_onnx_dir, args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -243,7 +243,7 @@ ensure_data_files() {
   ensure_dirs
   for filename in "${REQUIRED_DATA_FILES[@]}"; do
     local target="$RAW_DATA_DIR/$filename"
-    if [[ -f "$target" ]]; then
+    if [[ -f "$target" || -f "$target.gz" || -f "$target.zst" ]]; then
       continue
     fi
     local existing
@@ -344,9 +344,33 @@ wait_for_api() {
   done
 }
 
+submit_and_wait_ingest() {
+  local response job_id progress status
+  response="$(docker compose exec -T api curl -sf -X POST http://localhost:8000/ingest)" || return 1
+  job_id="$(python3 -c 'import json, sys; print(json.load(sys.stdin)["job_id"])' <<<"$response")" || return 1
+  echo "[melvin] Ingest job $job_id submitted."
+  while true; do
+    sleep 10
+    response="$(docker compose exec -T api curl -sf "http://localhost:8000/ingest/$job_id")" || return 1
+    progress="$(python3 -c '
+import json, sys
+job = json.load(sys.stdin)
+done, total, rate, eta = job["processed"], job["total"], job["items_per_second"], job.get("eta_seconds")
+print(job["status"], "|", job["phase"], f"{done}/{total}", f"{rate}/s", f"eta {eta}s" if eta is not None else "")
+' <<<"$response")" || return 1
+    status="${progress%% *}"
+    echo "[melvin] Ingest $progress"
+    case "$status" in
+      queued|running) ;;
+      completed) return 0 ;;
+      *) return 1 ;;
+    esac
+  done
+}
+
 run_data_ingest_sync() {
   echo "[melvin] Refreshing embeddings via API /ingest..."
-  if docker compose exec -T api curl -X POST http://localhost:8000/ingest; then
+  if submit_and_wait_ingest; then
     echo "[melvin] Embedding stores refreshed."
   else
     echo "[melvin] Failed to refresh embeddings. Check API logs or rerun 'docker compose exec api curl -X POST http://localhost:8000/ingest'."
@@ -359,7 +383,7 @@ run_data_ingest_async() {
   echo "[melvin] Refreshing embeddings via API /ingest (background). Logs: $log_file"
   (
     echo "[melvin] Ingest job started at $(date)"
-    if docker compose exec -T api curl -X POST http://localhost:8000/ingest; then
+    if submit_and_wait_ingest; then
       echo "[melvin] Embedding stores refreshed."
     else
       echo "[melvin] Failed to refresh embeddings. Check API logs or rerun 'docker compose exec api curl -X POST http://localhost:8000/ingest'."